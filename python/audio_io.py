@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import io
+import mmap
+import os
 from pathlib import Path
+import struct
+from typing import BinaryIO
 import wave
 
 import numpy as np
 
 
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
 class WavFormatError(ValueError):
     """Raised when a WAV file does not match 16kHz/mono/PCM16 requirements."""
 
@@ -17,13 +27,24 @@ class WavMetadata:
     sample_width: int
     sample_rate: int
     frame_count: int
+    audio_format: int = _WAVE_FORMAT_PCM
+
 
+def load_wav_pcm16_mono(path: str | Path | BinaryIO, out: np.ndarray | None = None) -> np.ndarray:
+    """Load a strict 16kHz mono PCM16 WAV file as float32 waveform in [-1, 1].
 
-def load_wav_pcm16_mono(path: str | Path) -> np.ndarray:
-    """Load a strict 16kHz mono PCM16 WAV file as float32 waveform in [-1, 1]."""
+    ``path`` may also be a seekable binary file object positioned at the RIFF header.
+    When ``out`` is a 1-D float32 array with room for every sample, the waveform is
+    written into its leading slice and that view is returned; otherwise a new array
+    is allocated.
+    """
 
     metadata, raw = _read_wav_bytes(path)
 
+    if metadata.audio_format != _WAVE_FORMAT_PCM:
+        raise WavFormatError(
+            f"Unsupported WAV encoding: format tag {metadata.audio_format:#06x}. Expected integer PCM."
+        )
     if metadata.channels != 1:
         raise WavFormatError(
             f"Unsupported WAV channel count: {metadata.channels}. Expected mono (1)."
@@ -37,35 +58,93 @@ def load_wav_pcm16_mono(path: str | Path) -> np.ndarray:
             f"Unsupported WAV sample rate: {metadata.sample_rate}. Expected 16000 Hz."
         )
 
-    waveform = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
-    return np.clip(waveform, -1.0, 1.0)
+    # int16 / 32768 already lies in [-1, 1), so no clip pass is needed.
+    pcm = np.frombuffer(raw, dtype="<i2")
+    if out is not None and out.dtype == np.float32 and out.ndim == 1 and out.size >= pcm.size:
+        return np.multiply(pcm, _PCM16_SCALE, out=out[: pcm.size])
+    return np.multiply(pcm, _PCM16_SCALE, dtype=np.float32)
 
 
-def read_wav_metadata(path: str | Path) -> WavMetadata:
+def read_wav_metadata(path: str | Path | BinaryIO) -> WavMetadata:
     """Read WAV metadata without decoding audio payload."""
 
     metadata, _ = _read_wav_bytes(path, read_frames=False)
     return metadata
 
 
-def _read_wav_bytes(path: str | Path, read_frames: bool = True) -> tuple[WavMetadata, bytes]:
+def _read_wav_bytes(path: str | Path | BinaryIO, read_frames: bool = True) -> tuple[WavMetadata, memoryview]:
+    if hasattr(path, "read"):
+        return _read_wav_stream(path, read_frames)
+
     wav_path = Path(path).expanduser().resolve()
     if not wav_path.exists():
         raise FileNotFoundError(f"Audio file not found: {wav_path}")
 
-    with wave.open(str(wav_path), "rb") as wf:
-        channels = int(wf.getnchannels())
-        sample_width = int(wf.getsampwidth())
-        sample_rate = int(wf.getframerate())
-        frame_count = int(wf.getnframes())
-        raw = wf.readframes(frame_count) if read_frames else b""
-
-    return (
-        WavMetadata(
+    with wav_path.open("rb") as fh:
+        metadata, data_offset, data_size = _parse_wav_header(fh, os.fstat(fh.fileno()).st_size)
+        if not read_frames or data_size == 0:
+            return metadata, memoryview(b"")
+        # Map the file instead of copying the payload; the returned view keeps the mapping alive.
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return metadata, memoryview(mapped)[data_offset : data_offset + data_size]
+
+
+def _read_wav_stream(fh: BinaryIO, read_frames: bool) -> tuple[WavMetadata, memoryview]:
+    start = fh.tell()
+    total_size = fh.seek(0, os.SEEK_END)
+    fh.seek(start)
+    metadata, data_offset, data_size = _parse_wav_header(fh, total_size)
+    if not read_frames or data_size == 0:
+        return metadata, memoryview(b"")
+    if isinstance(fh, io.BytesIO):
+        # View the in-memory buffer directly instead of copying the payload out.
+        return metadata, fh.getbuffer()[data_offset : data_offset + data_size]
+    fh.seek(data_offset)
+    return metadata, memoryview(fh.read(data_size))
+
+
+def _parse_wav_header(fh: BinaryIO, total_size: int) -> tuple[WavMetadata, int, int]:
+    """Walk the RIFF chunks up to ``data``; return metadata and the payload offset/size."""
+
+    riff = fh.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise wave.Error("file does not start with RIFF/WAVE id")
+
+    fmt: bytes | None = None
+    while True:
+        header = fh.read(8)
+        if len(header) < 8:
+            break
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = fh.read(chunk_size)
+            if len(fmt) < 16:
+                raise wave.Error("fmt chunk is truncated")
+            fh.seek(chunk_size & 1, os.SEEK_CUR)
+            continue
+        if chunk_id != b"data":
+            fh.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+            continue
+        if fmt is None:
+            raise wave.Error("data chunk before fmt chunk")
+
+        audio_format, channels, sample_rate, _, _, bits_per_sample = struct.unpack_from("<HHIIHH", fmt)
+        if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            audio_format = struct.unpack_from("<H", fmt, 24)[0]
+        sample_width = (bits_per_sample + 7) // 8
+
+        data_offset = fh.tell()
+        data_size = min(chunk_size, total_size - data_offset)
+        frame_size = channels * sample_width
+        frame_count = data_size // frame_size if frame_size > 0 else 0
+        metadata = WavMetadata(
             channels=channels,
             sample_width=sample_width,
             sample_rate=sample_rate,
             frame_count=frame_count,
-        ),
-        raw,
-    )
+            audio_format=audio_format,
+        )
+        return metadata, data_offset, frame_count * frame_size
+
+    raise wave.Error("fmt chunk and/or data chunk missing")
@@ -40,11 +40,165 @@ try:
 except Exception:  # pragma: no cover - optional runtime import
     speexdsp = None
 
+try:
+    import numba  # type: ignore
+except Exception:  # pragma: no cover - optional runtime import
+    numba = None
+
+try:
+    from scipy.ndimage import gaussian_filter1d
+except Exception:  # pragma: no cover - optional runtime import
+    gaussian_filter1d = None
+
 
 def _clamp(value: float, lower: float, upper: float) -> float:
     return max(lower, min(upper, value))
 
 
+_DB_TO_LIN_COEF = math.log(10.0) / 20.0
+
+
+def _db_to_linear(db: float) -> float:
+    return math.exp(db * _DB_TO_LIN_COEF)
+
+
+def _jit(**options: Any):
+    """Compile a per-sample kernel with numba when available, else keep it as plain Python."""
+
+    def decorate(func):
+        if numba is None:
+            return func
+        return numba.njit(**options)(func)
+
+    return decorate
+
+
+@_jit(cache=True, fastmath=True)
+def _high_pass_kernel(signal: np.ndarray, alpha: float) -> None:
+    # In-place one-pole HPF; the previous input sample is carried as a scalar.
+    prev = signal[0]
+    for i in range(1, signal.size):
+        cur = signal[i]
+        signal[i] = alpha * (signal[i - 1] + cur - prev)
+        prev = cur
+
+
+@_jit(cache=True, fastmath=True)
+def _dc_hpf_kernel(signal: np.ndarray, alpha: float, high_pass: bool, out: np.ndarray) -> float:
+    # Pass 1 measures the DC offset of the clipped input; pass 2 clips, centers and
+    # high-passes in one sweep without materializing the centered signal.
+    total = 0.0
+    for i in range(signal.size):
+        total += min(1.0, max(-1.0, signal[i]))
+    dc = total / signal.size
+
+    prev = min(1.0, max(-1.0, signal[0])) - dc
+    out[0] = prev
+    for i in range(1, signal.size):
+        cur = min(1.0, max(-1.0, signal[i])) - dc
+        out[i] = alpha * (out[i - 1] + cur - prev) if high_pass else cur
+        prev = cur
+    return dc
+
+
+@_jit(cache=True, fastmath=True, boundscheck=False)
+def _upward_comp_kernel(
+    signal: np.ndarray,
+    attack: float,
+    release: float,
+    threshold: float,
+    inv_ratio_exp: float,
+    max_gain: float,
+    out: np.ndarray,
+) -> tuple[float, float]:
+    log_threshold = math.log(threshold)
+    env = 0.0
+    gain_sum = 0.0
+    peak_gain = 1.0
+    for i in range(signal.size):
+        sample = signal[i]
+        level = sample if sample >= 0.0 else -sample
+        coef = attack if level > env else release
+        env = coef * env + (1.0 - coef) * level
+        if env < threshold:
+            gain = math.exp(inv_ratio_exp * (log_threshold - math.log(max(env, 1e-5))))
+            if gain > max_gain:
+                gain = max_gain
+            elif gain < 1.0:
+                gain = 1.0
+        else:
+            gain = 1.0
+        out[i] = sample * gain
+        gain_sum += gain
+        if gain > peak_gain:
+            peak_gain = gain
+    return gain_sum, peak_gain
+
+
+@_jit(cache=True, fastmath=True, boundscheck=False)
+def _limiter_kernel(
+    signal: np.ndarray,
+    attack: float,
+    release: float,
+    threshold: float,
+    out: np.ndarray,
+) -> float:
+    gain = 1.0
+    min_gain = 1.0
+    for i in range(signal.size):
+        sample = signal[i]
+        level = sample if sample >= 0.0 else -sample
+        target_gain = 1.0 if level <= threshold else threshold / max(level, 1e-6)
+        coef = attack if target_gain < gain else release
+        gain = coef * gain + (1.0 - coef) * target_gain
+        if gain < min_gain:
+            min_gain = gain
+        value = sample * gain
+        out[i] = -1.0 if value < -1.0 else (1.0 if value > 1.0 else value)
+    return min_gain
+
+
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+_RMS_BLOCK_SIZE = 1 << 16
+
+# Smoothing kernels keyed by odd window length. The engine only uses a couple of
+# window sizes, and they are config-independent, so the cache is shared here.
+_GAUSS_KERNELS: dict[int, np.ndarray] = {}
+
+
+def _gaussian_kernel(length: int) -> np.ndarray:
+    kernel = _GAUSS_KERNELS.get(length)
+    if kernel is not None:
+        return kernel
+    sigma = max(1.0, length / 6.0)
+    half = length // 2
+    xs = np.arange(-half, half + 1, dtype=np.float32)
+    kernel = np.exp(-(xs ** 2) / (2.0 * sigma * sigma))
+    kernel /= np.sum(kernel)
+    kernel.setflags(write=False)
+    return _GAUSS_KERNELS.setdefault(length, kernel)
+
+
+@_jit(cache=True, fastmath=True, boundscheck=False)
+def _frame_gain_kernel(signal: np.ndarray, gains: np.ndarray, frame_len: int, out: np.ndarray) -> None:
+    for i in range(signal.size):
+        out[i] = signal[i] * gains[i // frame_len]
+
+
+@_jit(cache=True, fastmath=True, boundscheck=False)
+def _output_stats_kernel(signal: np.ndarray, clip_limit: float) -> tuple[float, float, int]:
+    energy = 0.0
+    peak = 0.0
+    clipped = 0
+    for i in range(signal.size):
+        level = abs(float(signal[i]))
+        energy += level * level
+        peak = max(peak, level)
+        if level >= clip_limit:
+            clipped += 1
+    return energy, peak, clipped
+
+
 @dataclass
 class LimiterConfig:
     enabled: bool = True
@@ -93,13 +247,22 @@ def probe_enhancement_plugins() -> dict[str, Any]:
         "rnnoise": rnnoise is not None,
         "deepfilternet": deepfilternet is not None,
         "speexdsp": speexdsp is not None,
+        "numba": numba is not None,
+        "scipy": gaussian_filter1d is not None,
         "ffmpeg": shutil.which("ffmpeg") is not None,
     }
 
 
 class EnhancementEngine:
+    """Runs the v2 enhancement chain.
+
+    An engine keeps scratch buffers between ``process()`` calls, so a single
+    instance must not be shared across threads without external locking.
+    """
+
     def __init__(self, config: EnhancementV2Config):
         self.config = config
+        self._scratch: dict[str, np.ndarray] = {}
 
     def process(
         self,
@@ -118,13 +281,8 @@ class EnhancementEngine:
             stats["v2_empty_input"] = True
             return EnhancementV2Result(signal=signal.astype(np.float32, copy=False), stats=stats)
 
-        work = np.clip(signal.astype(np.float32, copy=False), -1.0, 1.0)
-
-        work, dc_stats = self._apply_dc_removal(work)
-        stats.update(dc_stats)
-
-        work, hpf_stats = self._apply_high_pass_filter(work, self.config.hpf_cutoff_hz, sample_rate)
-        stats.update(hpf_stats)
+        work, dc_hpf_stats = self._apply_dc_hpf_stage(signal, self.config.hpf_cutoff_hz, sample_rate)
+        stats.update(dc_hpf_stats)
 
         work, ns_stats = self._apply_noise_suppression(work, sample_rate)
         stats.update(ns_stats)
@@ -142,42 +300,55 @@ class EnhancementEngine:
         work, dynamics_stats = self._apply_dynamics_stage(work)
         stats.update(dynamics_stats)
 
-        work, limiter_stats = self._apply_limiter(work)
+        work, limiter_stats = self._apply_limiter(work, out=work)
         stats.update(limiter_stats)
 
-        stats["output_rms_dbfs"] = round(self._estimate_rms_dbfs(work), 2)
-        stats["output_peak_dbfs"] = round(self._estimate_peak_dbfs(work), 2)
-        stats["clipping_sample_ratio"] = round(float(np.mean(np.abs(work) >= 0.999)), 6)
-        return EnhancementV2Result(signal=work.astype(np.float32, copy=False), stats=stats)
+        rms_dbfs, peak_dbfs, clipping_ratio = self._measure_output(work)
+        stats["output_rms_dbfs"] = round(rms_dbfs, 2)
+        stats["output_peak_dbfs"] = round(peak_dbfs, 2)
+        stats["clipping_sample_ratio"] = round(clipping_ratio, 6)
+        return EnhancementV2Result(signal=work, stats=stats)
+
+    def _scratch_buffer(self, name: str, size: int, dtype: Any) -> np.ndarray:
+        """Return a reusable 1-D buffer of at least ``size`` elements (contents undefined)."""
 
-    def _apply_dc_removal(self, signal: np.ndarray) -> tuple[np.ndarray, dict[str, Any]]:
-        dc = float(np.mean(signal))
-        centered = signal - dc
-        return centered.astype(np.float32, copy=False), {"dc_offset_removed": round(dc, 6)}
+        buffer = self._scratch.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(max(size, 1), dtype=dtype)
+            self._scratch[name] = buffer
+        return buffer[:size]
 
-    def _apply_high_pass_filter(
+    def _apply_dc_hpf_stage(
         self,
         signal: np.ndarray,
         cutoff_hz: float,
         sample_rate: int,
     ) -> tuple[np.ndarray, dict[str, Any]]:
-        if signal.size < 2 or cutoff_hz <= 0:
-            return signal, {"hpf_enabled": False}
-
-        dt = 1.0 / float(sample_rate)
-        rc = 1.0 / (2.0 * math.pi * cutoff_hz)
-        alpha = rc / (rc + dt)
-
-        output = np.empty_like(signal, dtype=np.float32)
-        output[0] = signal[0]
-        for i in range(1, signal.size):
-            output[i] = alpha * (output[i - 1] + signal[i] - signal[i - 1])
-
-        stats = {
-            "hpf_enabled": True,
-            "hpf_cutoff_hz": round(cutoff_hz, 2),
-            "hpf_alpha": round(alpha, 6),
+        high_pass = signal.size >= 2 and cutoff_hz > 0
+        alpha = 0.0
+        if high_pass:
+            dt = 1.0 / float(sample_rate)
+            rc = 1.0 / (2.0 * math.pi * cutoff_hz)
+            alpha = rc / (rc + dt)
+
+        output = np.empty(signal.shape, dtype=np.float32)
+        if numba is not None:
+            dc = _dc_hpf_kernel(signal, alpha, high_pass, output)
+        else:
+            # Without numba only the recursion runs per sample; clip and DC stay vectorized.
+            np.clip(signal, -1.0, 1.0, out=output)
+            dc = float(np.mean(output, dtype=np.float64))
+            output -= np.float32(dc)
+            if high_pass:
+                _high_pass_kernel(output, alpha)
+
+        stats: dict[str, Any] = {
+            "dc_offset_removed": round(float(dc), 6),
+            "hpf_enabled": high_pass,
         }
+        if high_pass:
+            stats["hpf_cutoff_hz"] = round(cutoff_hz, 2)
+            stats["hpf_alpha"] = round(alpha, 6)
         return output, stats
 
     def _apply_noise_suppression(
@@ -236,28 +407,34 @@ class EnhancementEngine:
         except Exception as exc:  # pragma: no cover - runtime dependency path
             return signal, {"ns_backend": "error", "ns_error": f"init_failed: {exc}"}
 
-        processed = np.empty_like(signal, dtype=np.float32)
+        # Convert the whole signal to PCM16 once and hand out 10ms byte slices of it.
+        padded_size = signal.size + (-signal.size) % frame_size
+        pcm = self._scratch_buffer("ns_pcm_in", padded_size, np.int16)
+        self._float_to_pcm16(signal, out=pcm[: signal.size])
+        pcm[signal.size :] = 0
+        pcm_bytes = memoryview(pcm).cast("B")
+        frame_bytes = frame_size * 2
+
+        # Collect APM output as PCM16 and convert once; short frames stay zero-padded.
+        processed_pcm = self._scratch_buffer("ns_pcm_out", padded_size, np.int16)
+        processed_pcm.fill(0)
         frames_processed = 0
         for start in range(0, signal.size, frame_size):
-            end = min(start + frame_size, signal.size)
-            frame = signal[start:end]
-            if frame.size < frame_size:
-                frame = np.pad(frame, (0, frame_size - frame.size))
             try:
-                payload = self._float_to_pcm16(frame).tobytes()
+                payload = pcm_bytes[start * 2 : start * 2 + frame_bytes].tobytes()
                 out_payload = apm.process_stream(payload)
                 if isinstance(out_payload, str):
                     out_payload = out_payload.encode("latin1")
-                out_frame = np.frombuffer(out_payload, dtype=np.int16).astype(np.float32) / 32768.0
-                if out_frame.size < frame_size:
-                    out_frame = np.pad(out_frame, (0, frame_size - out_frame.size))
+                out_frame = np.frombuffer(out_payload, dtype=np.int16)[:frame_size]
             except Exception as exc:  # pragma: no cover - runtime dependency path
                 return signal, {"ns_backend": "error", "ns_error": f"process_failed: {exc}"}
 
-            processed[start:end] = out_frame[: end - start]
+            processed_pcm[start : start + out_frame.size] = out_frame
             frames_processed += 1
 
-        return processed.astype(np.float32, copy=False), {
+        # The APM output replaces the engine-owned work buffer in place.
+        np.multiply(processed_pcm[: signal.size], _PCM16_SCALE, out=signal)
+        return signal, {
             "ns_backend": "webrtc_apm",
             "ns_frames_processed": frames_processed,
             "ns_level": ns_level,
@@ -271,6 +448,7 @@ class EnhancementEngine:
         sample_rate: int,
         speech_mask: np.ndarray | None,
     ) -> tuple[np.ndarray, dict[str, Any]]:
+        # Loudness stages scale the engine-owned work buffer in place.
         strategy = self.config.loudness_strategy
         if strategy == "lufs":
             out, stats = self._apply_lufs_normalization(signal, sample_rate, speech_mask)
@@ -302,7 +480,8 @@ class EnhancementEngine:
             return fallback, fallback_stats
 
         try:
-            measured_lufs = float(meter.integrated_loudness(measure.astype(np.float64)))
+            # pyloudnorm validates any floating dtype and copies the input itself.
+            measured_lufs = float(meter.integrated_loudness(measure))
         except Exception:
             fallback, fallback_stats = self._apply_rms_target(signal)
             fallback_stats["lufs_backend"] = "fallback_rms_error"
@@ -310,9 +489,8 @@ class EnhancementEngine:
 
         target = float(self.config.targets.lufs_target)
         gain_db = _clamp(target - measured_lufs, -12.0, float(self.config.targets.max_gain_db))
-        gain_linear = float(10.0 ** (gain_db / 20.0))
-        out = signal * gain_linear
-        return out.astype(np.float32, copy=False), {
+        np.multiply(signal, _db_to_linear(gain_db), out=signal)
+        return signal, {
             "lufs_backend": "pyloudnorm",
             "speech_lufs": round(measured_lufs, 2),
             "target_lufs": round(target, 2),
@@ -334,44 +512,59 @@ class EnhancementEngine:
             smooth_window = 13
         frame_len = max(1, int(round(sample_rate * (frame_len_ms / 1000.0))))
         max_gain = min(float(self.config.targets.max_gain_db), 10.0)
-        max_gain_linear = 10.0 ** (max_gain / 20.0)
+        max_gain_linear = _db_to_linear(max_gain)
         peak_target = 0.95
 
         # Threshold gate to avoid lifting near-silence.
         noise_db = self._estimate_noise_floor_db(signal)
         gate_db = noise_db + 8.0
 
-        frame_gains: list[float] = []
-        for start in range(0, signal.size, frame_len):
-            frame = signal[start : min(signal.size, start + frame_len)]
-            rms_db = self._estimate_rms_dbfs(frame)
-            peak = float(np.max(np.abs(frame))) if frame.size else 0.0
-            if rms_db < gate_db:
-                desired_gain = 1.0
-            else:
-                desired_gain = peak_target / max(peak, 1e-5)
-                desired_gain = _clamp(desired_gain, 1.0, max_gain_linear)
-            frame_gains.append(float(desired_gain))
-
-        if not frame_gains:
+        frame_count = -(-signal.size // frame_len)
+        if frame_count == 0:
             return signal, {
                 "loudness_backend": "dynaudnorm_like",
                 "applied_gain_db": 0.0,
                 "noise_gate_db": round(gate_db, 2),
             }
 
-        smoothed = self._smooth_curve(np.array(frame_gains, dtype=np.float32), window=smooth_window)
-        out = np.empty_like(signal, dtype=np.float32)
-        for idx, start in enumerate(range(0, signal.size, frame_len)):
-            end = min(signal.size, start + frame_len)
-            out[start:end] = signal[start:end] * float(smoothed[idx])
+        # Zero-pad to whole frames so per-frame stats become axis reductions; the tail
+        # frame's RMS is still normalized by its real length.
+        pad = frame_count * frame_len - signal.size
+        if pad:
+            padded = self._scratch_buffer("dyn_frames", frame_count * frame_len, signal.dtype)
+            padded[: signal.size] = signal
+            padded[signal.size :] = 0.0
+        else:
+            padded = signal
+        frames = padded.reshape(frame_count, frame_len)
+        frame_sizes = np.full(frame_count, frame_len, dtype=np.float64)
+        frame_sizes[-1] = frame_len - pad
+        frame_rms = np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_sizes)
+        frame_peaks = np.maximum(np.max(frames, axis=1), -np.min(frames, axis=1))
+        frame_gains = np.where(
+            np.maximum(frame_rms, 1e-7) < _db_to_linear(gate_db),
+            1.0,
+            np.clip(peak_target / np.maximum(frame_peaks, 1e-5), 1.0, max_gain_linear),
+        ).astype(np.float32)
+
+        smoothed = self._smooth_curve(frame_gains, window=smooth_window)
 
         # keep threshold gating on non-speech area if we have mask
-        if speech_mask is not None and speech_mask.size == out.size:
-            out[~speech_mask] = signal[~speech_mask]
+        non_speech = None
+        if speech_mask is not None and speech_mask.size == signal.size:
+            non_speech = ~speech_mask
+            ungated = signal[non_speech]
+
+        if numba is not None:
+            _frame_gain_kernel(signal, smoothed, frame_len, signal)
+        else:
+            signal *= np.repeat(smoothed, frame_len)[: signal.size]
+
+        if non_speech is not None:
+            signal[non_speech] = ungated
 
         applied_gain_db = 20.0 * math.log10(max(float(np.mean(smoothed)), 1e-7))
-        return out.astype(np.float32, copy=False), {
+        return signal, {
             "loudness_backend": "dynaudnorm_like",
             "applied_gain_db": round(applied_gain_db, 2),
             "noise_gate_db": round(gate_db, 2),
@@ -390,9 +583,8 @@ class EnhancementEngine:
         target_db = target_map.get(self.config.mode, -24.0)
         measured = self._estimate_rms_dbfs(signal)
         gain_db = _clamp(target_db - measured, 0.0, float(self.config.targets.max_gain_db))
-        gain_linear = 10.0 ** (gain_db / 20.0)
-        out = signal * gain_linear
-        return out.astype(np.float32, copy=False), {
+        np.multiply(signal, _db_to_linear(gain_db), out=signal)
+        return signal, {
             "loudness_backend": "rms_target",
             "applied_gain_db": round(gain_db, 2),
             "target_rms_dbfs": round(target_db, 2),
@@ -402,7 +594,7 @@ class EnhancementEngine:
         if self.config.dynamics == "off":
             return signal, {"dynamics_backend": "off"}
 
-        compressed, comp_stats = self._apply_upward_compressor(signal)
+        compressed, comp_stats = self._apply_upward_compressor(signal, out=signal)
         if self.config.dynamics == "upward_comp":
             comp_stats["dynamics_backend"] = "upward_comp"
             return compressed, comp_stats
@@ -411,13 +603,18 @@ class EnhancementEngine:
             compressed,
             force_enable=True,
             threshold_override=min(self.config.limiter.threshold, 0.99),
+            out=compressed,
         )
         merged = dict(comp_stats)
         merged.update({f"dyn_{key}": value for key, value in limiter_stats.items()})
         merged["dynamics_backend"] = "comp_limiter"
         return limited, merged
 
-    def _apply_upward_compressor(self, signal: np.ndarray) -> tuple[np.ndarray, dict[str, Any]]:
+    def _apply_upward_compressor(
+        self,
+        signal: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, dict[str, Any]]:
         threshold = 0.125
         ratio = 2.0
         attack_ms = 20.0
@@ -427,30 +624,25 @@ class EnhancementEngine:
         attack = math.exp(-1.0 / max(1.0, (attack_ms / 1000.0) * sample_rate))
         release = math.exp(-1.0 / max(1.0, (release_ms / 1000.0) * sample_rate))
 
-        env = 0.0
-        out = np.empty_like(signal, dtype=np.float32)
-        gain_trace = np.empty_like(signal, dtype=np.float32)
-        max_gain = 10.0 ** (min(self.config.targets.max_gain_db, 18.0) / 20.0)
-
-        for i, sample in enumerate(signal):
-            level = abs(float(sample))
-            coef = attack if level > env else release
-            env = coef * env + (1.0 - coef) * level
-            if env < threshold:
-                gain = (threshold / max(env, 1e-5)) ** (1.0 - 1.0 / ratio)
-            else:
-                gain = 1.0
-            gain = _clamp(gain, 1.0, max_gain)
-            out[i] = sample * gain
-            gain_trace[i] = gain
+        # ``out`` may alias ``signal``: the kernel reads each sample before writing it.
+        if out is None:
+            out = np.empty_like(signal, dtype=np.float32)
+        max_gain = _db_to_linear(min(self.config.targets.max_gain_db, 18.0))
+
+        gain_sum, peak_gain = _upward_comp_kernel(
+            signal,
+            attack,
+            release,
+            threshold,
+            1.0 - 1.0 / ratio,
+            max_gain,
+            out,
+        )
 
-        avg_gain = float(np.mean(gain_trace))
-        return out.astype(np.float32, copy=False), {
+        avg_gain = gain_sum / signal.size if signal.size else 1.0
+        return out, {
             "upward_comp_avg_gain_db": round(20.0 * math.log10(max(avg_gain, 1e-7)), 2),
-            "upward_comp_peak_gain_db": round(
-                20.0 * math.log10(max(float(np.max(gain_trace)), 1e-7)),
-                2,
-            ),
+            "upward_comp_peak_gain_db": round(20.0 * math.log10(max(peak_gain, 1e-7)), 2),
             "upward_comp_threshold": threshold,
             "upward_comp_ratio": ratio,
         }
@@ -460,6 +652,7 @@ class EnhancementEngine:
         signal: np.ndarray,
         force_enable: bool = False,
         threshold_override: float | None = None,
+        out: np.ndarray | None = None,
     ) -> tuple[np.ndarray, dict[str, Any]]:
         limiter_cfg = self.config.limiter
         enabled = force_enable or limiter_cfg.enabled
@@ -478,20 +671,10 @@ class EnhancementEngine:
         attack = math.exp(-1.0 / max(1.0, (attack_ms / 1000.0) * sample_rate))
         release = math.exp(-1.0 / max(1.0, (release_ms / 1000.0) * sample_rate))
 
-        gain = 1.0
-        gains = np.empty_like(signal, dtype=np.float32)
-        out = np.empty_like(signal, dtype=np.float32)
-
-        for i, sample in enumerate(signal):
-            abs_sample = abs(float(sample))
-            target_gain = 1.0 if abs_sample <= threshold else threshold / max(abs_sample, 1e-6)
-            coef = attack if target_gain < gain else release
-            gain = coef * gain + (1.0 - coef) * target_gain
-            gains[i] = gain
-            out[i] = sample * gain
-
-        out = np.clip(out, -1.0, 1.0).astype(np.float32, copy=False)
-        reduction_db = -20.0 * math.log10(max(float(np.min(gains)), 1e-7))
+        if out is None:
+            out = np.empty_like(signal, dtype=np.float32)
+        min_gain = _limiter_kernel(signal, attack, release, threshold, out)
+        reduction_db = -20.0 * math.log10(max(min_gain, 1e-7))
         return out, {
             "limiter_enabled": True,
             "limiter_threshold": round(threshold, 4),
@@ -514,10 +697,31 @@ class EnhancementEngine:
             return 18, 68
         return 20, 58
 
+    def _measure_output(self, signal: np.ndarray) -> tuple[float, float, float]:
+        """Return (rms_dbfs, peak_dbfs, clipping_ratio) of the final signal."""
+
+        if numba is not None:
+            energy, peak, clipped = _output_stats_kernel(signal, 0.999)
+            rms = math.sqrt(energy / signal.size)
+            return (
+                20.0 * math.log10(max(rms, 1e-7)),
+                20.0 * math.log10(max(peak, 1e-7)),
+                clipped / signal.size,
+            )
+        clipped = int(np.count_nonzero(np.abs(signal) >= 0.999))
+        return self._estimate_rms_dbfs(signal), self._estimate_peak_dbfs(signal), clipped / signal.size
+
     def _estimate_rms_dbfs(self, signal: np.ndarray) -> float:
         if signal.size == 0:
             return -120.0
-        rms = float(np.sqrt(np.mean(np.square(signal, dtype=np.float64))))
+        # Per-block float32 dot products (BLAS sdot, no temporaries) summed in float64,
+        # which keeps rounding drift bounded on long recordings.
+        flat = signal.ravel()
+        energy = 0.0
+        for start in range(0, flat.size, _RMS_BLOCK_SIZE):
+            block = flat[start : start + _RMS_BLOCK_SIZE]
+            energy += float(np.dot(block, block))
+        rms = math.sqrt(energy / flat.size)
         return 20.0 * math.log10(max(rms, 1e-7))
 
     def _estimate_peak_dbfs(self, signal: np.ndarray) -> float:
@@ -529,13 +733,26 @@ class EnhancementEngine:
     def _estimate_noise_floor_db(self, signal: np.ndarray) -> float:
         if signal.size == 0:
             return -120.0
-        abs_signal = np.abs(signal)
-        p20 = float(np.percentile(abs_signal, 20))
+        # 20th percentile (linear interpolation, as np.percentile) via an in-place
+        # partition of a reused |x| scratch buffer instead of percentile's extra copy.
+        abs_signal = np.abs(signal, out=self._scratch_buffer("abs", signal.size, np.float32))
+        position = 0.2 * (abs_signal.size - 1)
+        lower = int(position)
+        upper = min(lower + 1, abs_signal.size - 1)
+        abs_signal.partition((lower, upper) if upper != lower else lower)
+        low_value = float(abs_signal[lower])
+        p20 = low_value + (position - lower) * (float(abs_signal[upper]) - low_value)
         return 20.0 * math.log10(max(p20, 1e-7))
 
-    def _float_to_pcm16(self, signal: np.ndarray) -> np.ndarray:
-        clipped = np.clip(signal, -1.0, 1.0)
-        return np.round(clipped * 32767.0).astype(np.int16, copy=False)
+    def _float_to_pcm16(self, signal: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        scaled = self._scratch_buffer("pcm16_scaled", signal.size, np.float32)
+        np.multiply(signal, np.float32(32767.0), out=scaled)
+        np.clip(scaled, -32767.0, 32767.0, out=scaled)
+        np.rint(scaled, out=scaled)
+        if out is None:
+            return scaled.astype(np.int16)
+        np.copyto(out, scaled, casting="unsafe")
+        return out
 
     def _smooth_curve(self, values: np.ndarray, window: int) -> np.ndarray:
         if values.size <= 1:
@@ -543,8 +760,14 @@ class EnhancementEngine:
         length = max(3, int(window) | 1)
         sigma = max(1.0, length / 6.0)
         half = length // 2
-        xs = np.arange(-half, half + 1, dtype=np.float32)
-        kernel = np.exp(-(xs ** 2) / (2.0 * sigma * sigma))
-        kernel /= np.sum(kernel)
+        if gaussian_filter1d is not None:
+            # Edge-padded Gaussian truncated at the same radius as the explicit kernel below.
+            return gaussian_filter1d(
+                values.astype(np.float32, copy=False),
+                sigma=sigma,
+                mode="nearest",
+                truncate=half / sigma,
+            )
+        kernel = _gaussian_kernel(length)
         padded = np.pad(values, (half, half), mode="edge")
         return np.convolve(padded, kernel, mode="valid").astype(np.float32, copy=False)
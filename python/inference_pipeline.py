@@ -4,23 +4,73 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+import copy
+import ctypes
+import functools
 import inspect
 import json
+import logging
 import os
 from pathlib import Path
 import shutil
+import struct
 import subprocess
 import sys
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import numpy as np
 
 from audio_io import WavFormatError, load_wav_pcm16_mono
 
 
+try:
+    import soundfile
+except Exception:  # pragma: no cover - optional dependency
+    soundfile = None
+
+try:
+    import soxr
+except Exception:  # pragma: no cover - optional dependency
+    soxr = None
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+logger = logging.getLogger("ghosttype.pipeline")
+
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+# <pthread/qos.h> QOS_CLASS_UTILITY: below user-initiated work, still eligible
+# for performance cores (QOS_CLASS_BACKGROUND = 0x09 would pin to E-cores).
+_QOS_CLASS_UTILITY = 0x11
+
+# MLX does not guarantee thread-safe graph evaluation and its default device is
+# process-global, so every evaluation (ASR decode, weight materialization,
+# prefill, generation) holds this lock. Only file I/O and lazy weight mapping
+# overlap across threads.
+_MLX_LOCK = threading.RLock()
+
+# Inference threads: ASR, LLM load and decode all run here (never on the stdio
+# thread) with utility QoS. Kept for the process lifetime so a failing job
+# never waits on a pending load.
+_WORKERS: ThreadPoolExecutor | None = None
+
+# Reused decode target for the PCM16 WAV fast path (30s at 16kHz); longer clips
+# allocate. transcribe() copies its input, so reuse across jobs is safe.
+_WAVEFORM_BUFFER = np.empty(30 * 16000, dtype=np.float32)
+
+# Containers libsndfile (1.1+) decodes itself; anything else goes to ffmpeg.
+_SNDFILE_SUFFIXES = {".wav", ".flac", ".ogg", ".oga", ".aif", ".aiff", ".mp3"}
+
+
 SYSTEM_PROMPT = (
     "你是一个拥有极高认知水平的“首席速记员”。你的唯一任务是提取用户杂乱口语中的【最终意图】，并输出为极其干净、结构化的书面文本。\n\n"
     "【绝对遵循以下五大铁律】：\n"
@@ -48,6 +98,30 @@ SYSTEM_PROMPT = (
 )
 
 
+# Placeholder user turn used to split the rendered chat template into a fixed
+# prefix (system prompt + user header) and suffix (turn end + assistant header).
+_USER_SENTINEL = "\u0000GHOSTTYPE_USER_TURN\u0000"
+
+
+# Sample user turn used to check that tokenizing the template pieces separately
+# matches tokenizing the fully rendered prompt.
+_TEMPLATE_PROBE_TEXT = "GhostType 语音 probe: 1, 2, 3."
+
+
+@dataclass
+class _PromptTemplate:
+    prefix_text: str
+    suffix_text: str
+    prefix_ids: list[int]
+    suffix_ids: list[int]
+
+
+_PROMPT_TEMPLATE: tuple[Any, _PromptTemplate | None] | None = None
+
+# Whether stream_generate takes token-id prompts: None until a decode tells us.
+_GENERATE_ACCEPTS_IDS: bool | None = None
+
+
 @dataclass
 class PipelineConfig:
     audio_path: Path
@@ -58,99 +132,300 @@ class PipelineConfig:
     skip_llm: bool
 
 
-def apply_background_scheduling() -> dict[str, str]:
-    """Best-effort QoS downgrade so inference does not contend with UI threads."""
-    status: dict[str, str] = {}
+@functools.lru_cache(maxsize=1)
+def _libsystem() -> Any:
+    return ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+
+
+def _apply_worker_qos() -> None:
+    """Worker-pool initializer: give each ASR/LLM thread utility QoS on macOS.
 
+    Only the pool threads are demoted; the main thread that reads jobs and
+    writes results for the Swift host keeps its default QoS.
+    """
+    if sys.platform != "darwin":
+        return
     try:
-        os.nice(10)
-        status["nice"] = "set_to_10"
-    except OSError as exc:
-        status["nice"] = f"not_set ({exc})"
+        result = _libsystem().pthread_set_qos_class_self_np(
+            ctypes.c_uint(_QOS_CLASS_UTILITY),
+            ctypes.c_int(0),
+        )
+    except (AttributeError, OSError) as exc:
+        logger.info("scheduling: thread QoS unavailable (%s)", exc)
+        return
+    if result != 0:
+        logger.info("scheduling: pthread_set_qos_class_self_np failed (%s)", os.strerror(result))
+    else:
+        logger.info("scheduling: %s set to utility QoS", threading.current_thread().name)
 
-    if sys.platform == "darwin":
-        pid = str(os.getpid())
-        try:
-            subprocess.run(
-                ["/usr/bin/renice", "10", "-p", pid],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            status["renice"] = "applied"
-        except FileNotFoundError:
-            status["renice"] = "missing"
 
+class ASRManager:
+    """Process-lifetime holder for the mlx-whisper entry point and warmed model."""
+
+    _transcribe: Any | None = None
+    _model_id: str | None = None
+
+    @classmethod
+    def get(cls, model_id: str) -> Any:
+        if cls._transcribe is None:
+            from mlx_whisper import transcribe
+
+            cls._transcribe = transcribe
+        if cls._model_id != model_id and cls._warm(model_id):
+            cls._model_id = model_id
+        return cls._transcribe
+
+    @staticmethod
+    def _warm(model_id: str) -> bool:
+        """Load the model into mlx-whisper's ModelHolder; False if that failed.
+
+        mlx-whisper keeps the last model in ModelHolder, so loading it up front
+        spares the first job. Older releases lack the holder and have nothing
+        to warm. A failed load is logged and retried by the next call.
+        """
         try:
-            subprocess.run(
-                ["/usr/sbin/taskpolicy", "-b", "-p", pid],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            status["taskpolicy"] = "background_applied"
-        except FileNotFoundError:
-            status["taskpolicy"] = "missing"
+            import mlx.core as mx
+            from mlx_whisper.transcribe import ModelHolder
+        except ImportError:
+            return True
+        try:
+            with _MLX_LOCK:
+                ModelHolder.get_model(model_id, mx.float16)
+        except Exception as exc:
+            logger.warning("asr: warmup of %s failed: %s", model_id, exc)
+            return False
+        return True
+
+
+class LLMManager:
+    """Process-lifetime cache for the mlx-lm model and tokenizer."""
+
+    _model: Any | None = None
+    _tokenizer: Any | None = None
+    _model_id: str | None = None
+    _prefix_ids: list[int] | None = None
+    _prefix_cache: Any | None = None
+    # SDPA path of the most recent decode; see _attention_path.
+    attention_status: str = "unknown"
+    # Guards the cached model and prefix state; taken before _MLX_LOCK, never after.
+    _lock = threading.RLock()
+
+    @classmethod
+    def get(cls, model_id: str) -> tuple[Any, Any]:
+        with cls._lock:
+            if cls._model is None or cls._model_id != model_id:
+                cls._load(model_id)
+            return cls._model, cls._tokenizer
+
+    @classmethod
+    def _load(cls, model_id: str) -> None:
+        from mlx_lm import load
+
+        # Drop the previous weights before loading the replacement.
+        cls._model = None
+        cls._tokenizer = None
+        cls._prefix_ids = None
+        cls._prefix_cache = None
+        # Map the weights lazily (file I/O only), then materialize them as an
+        # MLX evaluation under the lock.
+        model, tokenizer = load(model_id, lazy=True)
+        with _MLX_LOCK:
+            _use_gpu_device()
+            _materialize_weights(model)
+        cls._model, cls._tokenizer = model, tokenizer
+        cls._model_id = model_id
+
+    @classmethod
+    def prefill(cls, prefix_ids: list[int]) -> bool:
+        """Run the fixed prompt prefix through the model once and keep its KV cache."""
+        with cls._lock:
+            if cls._prefix_ids != prefix_ids:
+                with _MLX_LOCK:
+                    cls._prefix_cache = _prefill_prompt_cache(cls._model, prefix_ids)
+                cls._prefix_ids = prefix_ids
+            return cls._prefix_cache is not None
+
+    @classmethod
+    def prefix_cache(cls, prefix_ids: list[int]) -> Any | None:
+        """Return a private copy of the prefilled prefix cache, or None if unsupported."""
+        with cls._lock:
+            if not cls.prefill(prefix_ids):
+                return None
+            try:
+                return copy.deepcopy(cls._prefix_cache)
+            except Exception:
+                return None
+
+
+def _use_gpu_device() -> None:
+    # Metal is MLX's default on Apple Silicon; pin it so nothing ends up on CPU.
+    try:
+        import mlx.core as mx
+
+        if mx.metal.is_available():
+            mx.set_default_device(mx.gpu)
+    except Exception:
+        pass
+
+
+def _materialize_weights(model: Any) -> None:
+    import mlx.core as mx
+
+    mx.eval(model.parameters())
 
-    return status
+
+def _attention_path(prompt_cache: Any | None) -> str:
+    """Name the SDPA kernel mlx-lm used for ``prompt_cache`` after a decode.
+
+    mlx-lm dispatches on the cache type: plain KV caches go to the fused
+    ``mx.fast.scaled_dot_product_attention``, quantized ones to its unfused
+    quantized path. Without a cache we own, the path is unknown.
+    """
+    if prompt_cache is None:
+        return "unknown"
+    try:
+        from mlx_lm.models.cache import QuantizedKVCache
+    except Exception:
+        return "unknown"
+    if any(isinstance(entry, QuantizedKVCache) for entry in prompt_cache):
+        return "quantized_sdpa"
+    return "fused_sdpa"
+
+
+def _new_prompt_cache(model: Any) -> Any | None:
+    try:
+        from mlx_lm.models.cache import make_prompt_cache
+
+        return make_prompt_cache(model)
+    except Exception:
+        return None
+
+
+def _prefill_prompt_cache(model: Any, prompt_ids: list[int]) -> Any | None:
+    try:
+        import mlx.core as mx
+        from mlx_lm.models.cache import make_prompt_cache
+
+        cache = make_prompt_cache(model)
+        model(mx.array(prompt_ids)[None], cache=cache)
+        mx.eval([entry.state for entry in cache])
+        return cache
+    except Exception:
+        return None
 
 
 def _transcribe_with_fallback(audio_path: str, model_id: str, language: str) -> dict[str, Any]:
-    from mlx_whisper import transcribe
+    transcribe = ASRManager.get(model_id)
 
     if language.lower() == "auto":
         language_value: str | None = None
     else:
         language_value = language
 
-    transcribe_input, requires_ffmpeg = _prepare_transcribe_input(audio_path, transcribe)
+    transcribe_input = _prepare_transcribe_input(audio_path, transcribe)
 
-    try:
-        with _ffmpeg_decode_environment(requires_ffmpeg):
+    with _MLX_LOCK, _ffmpeg_on_path(isinstance(transcribe_input, str)):
+        try:
             return transcribe(
                 transcribe_input,
                 path_or_hf_repo=model_id,
                 language=language_value,
                 task="transcribe",
             )
-    except TypeError:
-        with _ffmpeg_decode_environment(requires_ffmpeg):
+        except TypeError:
             return transcribe(transcribe_input, path_or_hf_repo=model_id, language=language_value)
 
 
-def _prepare_transcribe_input(audio_path: str, transcribe_func: Any) -> tuple[str | np.ndarray, bool]:
-    path = Path(audio_path)
-    ffmpeg_path = _resolve_ffmpeg_path()
-    is_wav = path.suffix.lower() == ".wav"
-
-    if is_wav:
-        try:
-            waveform = load_wav_pcm16_mono(path)
-        except WavFormatError as exc:
-            if ffmpeg_path:
-                return audio_path, True
-            raise RuntimeError(
-                "WAV format is not 16kHz mono PCM16 and ffmpeg is unavailable. "
-                "Please re-record as WAV or install ffmpeg."
-            ) from exc
-        if _transcribe_supports_ndarray(transcribe_func):
-            return waveform, False
-        if ffmpeg_path:
-            return audio_path, True
+def _prepare_transcribe_input(audio_path: str, transcribe_func: Any) -> str | np.ndarray:
+    if not _transcribe_supports_ndarray(transcribe_func):
+        # Legacy mlx-whisper only takes paths and runs `ffmpeg` from PATH itself;
+        # _ffmpeg_on_path exposes the resolved binary for that call.
+        if _FFMPEG_BIN:
+            return audio_path
         raise RuntimeError(
             "Current mlx-whisper does not accept ndarray input and ffmpeg is unavailable."
         )
 
-    if ffmpeg_path:
-        return audio_path, True
+    path = Path(audio_path)
+    suffix = path.suffix.lower()
+
+    waveform: np.ndarray | None = None
+    if suffix == ".wav":
+        try:
+            waveform = load_wav_pcm16_mono(path, out=_WAVEFORM_BUFFER)
+        except WavFormatError as exc:
+            waveform = _decode_audio_inprocess(path)
+            if waveform is None and not _FFMPEG_BIN:
+                raise RuntimeError(
+                    "WAV format is not 16kHz mono PCM16 and ffmpeg is unavailable. "
+                    "Please re-record as WAV or install ffmpeg."
+                ) from exc
+    elif suffix in _SNDFILE_SUFFIXES:
+        waveform = _decode_audio_inprocess(path)
+
+    # Hand the waveform over unpadded: mlx-whisper appends its own 30s of
+    # silence and treats everything before it as content to decode.
+    if waveform is not None:
+        return waveform
+    if _FFMPEG_BIN:
+        return _decode_audio_ffmpeg(path)
     raise RuntimeError(
-        "Non-WAV input requires ffmpeg. Please install ffmpeg or provide 16kHz mono PCM16 WAV."
+        "This audio format requires ffmpeg. Please install ffmpeg or provide 16kHz mono PCM16 WAV."
     )
 
 
+def _decode_audio_inprocess(path: Path) -> np.ndarray | None:
+    """Decode to 16kHz mono float32 with libsndfile + soxr; None means use ffmpeg."""
+    if soundfile is None:
+        return None
+    try:
+        data, sample_rate = soundfile.read(str(path), dtype="float32", always_2d=True)
+    except Exception:
+        return None
+
+    waveform = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1, dtype=np.float32)
+    if sample_rate != 16000:
+        if soxr is None:
+            return None
+        waveform = soxr.resample(waveform, sample_rate, 16000, quality="HQ")
+    return np.ascontiguousarray(waveform, dtype=np.float32)
+
+
+def _decode_audio_ffmpeg(path: Path) -> np.ndarray:
+    """Decode with the resolved ffmpeg binary, matching mlx-whisper's load_audio output."""
+    cmd = [
+        _FFMPEG_BIN,
+        "-nostdin",
+        "-threads",
+        "0",
+        "-i",
+        str(path),
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        "16000",
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as exc:
+        detail = exc.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg failed to decode audio: {detail}") from exc
+    except OSError as exc:
+        raise RuntimeError(f"ffmpeg could not be started: {exc}") from exc
+    # One fused int16 -> float32 scaling pass (1/32768 is exact in float32).
+    return np.multiply(np.frombuffer(out, dtype=np.int16), _PCM16_SCALE, dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=4)
 def _transcribe_supports_ndarray(transcribe_func: Any) -> bool:
+    # Only the call shape matters, so bind a placeholder rather than an array.
     try:
-        inspect.signature(transcribe_func).bind(np.zeros(1, dtype=np.float32), path_or_hf_repo="dummy")
+        inspect.signature(transcribe_func).bind(object(), path_or_hf_repo="dummy")
         return True
     except Exception:
         return False
@@ -163,28 +438,31 @@ def _resolve_ffmpeg_path() -> str | None:
     return shutil.which("ffmpeg")
 
 
+# Resolved once per process; decoding invokes this binary directly instead of
+# relying on PATH, which is only touched for legacy path-only mlx-whisper.
+_FFMPEG_BIN = _resolve_ffmpeg_path()
+
+
 @contextmanager
-def _ffmpeg_decode_environment(requires_ffmpeg: bool):
-    if not requires_ffmpeg:
+def _ffmpeg_on_path(enabled: bool) -> Iterator[None]:
+    """Temporarily put the resolved ffmpeg's directory first on PATH."""
+    if not enabled or not _FFMPEG_BIN:
         yield
         return
-
-    ffmpeg_path = _resolve_ffmpeg_path()
-    if not ffmpeg_path:
-        raise RuntimeError("ffmpeg is required for decoding this audio format but was not found.")
-
-    ffmpeg_dir = str(Path(ffmpeg_path).resolve().parent)
-    original_path = str(os.environ.get("PATH") or "")
-    has_dir = ffmpeg_dir in [entry for entry in original_path.split(os.pathsep) if entry]
-    if has_dir:
+    ffmpeg_dir = str(Path(_FFMPEG_BIN).resolve().parent)
+    original_path = os.environ.get("PATH")
+    entries = [entry for entry in (original_path or "").split(os.pathsep) if entry]
+    if entries[:1] == [ffmpeg_dir]:
         yield
         return
-
-    os.environ["PATH"] = f"{ffmpeg_dir}{os.pathsep}{original_path}" if original_path else ffmpeg_dir
+    os.environ["PATH"] = os.pathsep.join([ffmpeg_dir, *entries])
     try:
         yield
     finally:
-        os.environ["PATH"] = original_path
+        if original_path is None:
+            os.environ.pop("PATH", None)
+        else:
+            os.environ["PATH"] = original_path
 
 
 def run_asr(config: PipelineConfig) -> tuple[str, float]:
@@ -199,65 +477,207 @@ def run_asr(config: PipelineConfig) -> tuple[str, float]:
     return raw_text, elapsed_ms
 
 
-def _generate_with_fallback(model: Any, tokenizer: Any, prompt: str, max_tokens: int) -> str:
-    from mlx_lm import generate
-
-    try:
-        return generate(
-            model,
-            tokenizer,
-            prompt=prompt,
-            max_tokens=max_tokens,
-            temp=0.2,
-            verbose=False,
-        )
-    except TypeError:
+def _stream_generate_with_fallback(
+    model: Any,
+    tokenizer: Any,
+    prompt: str | list[int],
+    max_tokens: int,
+    prompt_cache: Any | None = None,
+    on_text: Callable[[str], None] | None = None,
+) -> str:
+    """Decode with ``stream_generate``, handing each text segment to ``on_text``."""
+    from mlx_lm import stream_generate
+
+    # A prompt cache means ``prompt`` is only the tail after the cached prefix,
+    # so the cache is kept on every attempt.
+    extra: dict[str, Any] = {} if prompt_cache is None else {"prompt_cache": prompt_cache}
+    # Refinement is deterministic: greedy decoding throughout. Older mlx-lm
+    # takes `temp`; current releases reject it and are greedy without a sampler.
+    # The KV cache is left unquantized: refinement contexts are a few hundred
+    # tokens, where quantizing saves nothing and forces the unfused SDPA path.
+    attempts: tuple[dict[str, Any], ...] = ({"temp": 0.0}, {})
+    for index, sampling in enumerate(attempts):
+        pieces: list[str] = []
         try:
-            return generate(model, tokenizer, prompt=prompt, max_tokens=max_tokens)
+            for response in stream_generate(model, tokenizer, prompt, max_tokens=max_tokens, **sampling, **extra):
+                text = getattr(response, "text", response)
+                if not text:
+                    continue
+                pieces.append(text)
+                if on_text is not None:
+                    on_text(text)
         except TypeError:
-            return generate(model, tokenizer, prompt, max_tokens=max_tokens)
+            # Unsupported sampling kwargs fail before the first token; anything
+            # after output has started is a real error.
+            if pieces or index == len(attempts) - 1:
+                raise
+            continue
+        return "".join(pieces)
+    return ""
 
 
-def run_llm(raw_text: str, config: PipelineConfig) -> tuple[str, float]:
-    if not raw_text:
-        return "", 0.0
-
-    from mlx_lm import load
-
-    t0 = time.perf_counter()
-    model, tokenizer = load(config.llm_model)
-    messages = [
+def _chat_messages(user_text: str) -> list[dict[str, str]]:
+    return [
         {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": raw_text},
+        {"role": "user", "content": user_text},
     ]
-    prompt = tokenizer.apply_chat_template(
-        messages,
+
+
+def _encode_prompt_text(tokenizer: Any, text: str) -> list[int]:
+    # Same BOS rule mlx-lm applies when it tokenizes a string prompt itself.
+    bos_token = getattr(tokenizer, "bos_token", None)
+    add_special_tokens = bos_token is None or not text.startswith(bos_token)
+    return list(tokenizer.encode(text, add_special_tokens=add_special_tokens))
+
+
+def _prompt_template(tokenizer: Any) -> _PromptTemplate | None:
+    """Render the chat template once per tokenizer and cache its fixed parts."""
+    global _PROMPT_TEMPLATE
+    cached = _PROMPT_TEMPLATE
+    if cached is not None and cached[0] is tokenizer:
+        return cached[1]
+    template = _split_prompt_template(tokenizer)
+    _PROMPT_TEMPLATE = (tokenizer, template)
+    return template
+
+
+def _render_chat_prompt(tokenizer: Any, user_text: str) -> str:
+    return tokenizer.apply_chat_template(
+        _chat_messages(user_text),
         tokenize=False,
         add_generation_prompt=True,
     )
-    generated = _generate_with_fallback(
-        model=model,
-        tokenizer=tokenizer,
-        prompt=prompt,
-        max_tokens=config.max_tokens,
+
+
+def _split_prompt_template(tokenizer: Any) -> _PromptTemplate | None:
+    """Split the template around the user turn; None if the pieces do not tokenize cleanly."""
+    rendered = _render_chat_prompt(tokenizer, _USER_SENTINEL)
+    if rendered.count(_USER_SENTINEL) != 1:
+        return None
+    prefix_text, suffix_text = rendered.split(_USER_SENTINEL)
+    template = _PromptTemplate(
+        prefix_text=prefix_text,
+        suffix_text=suffix_text,
+        prefix_ids=_encode_prompt_text(tokenizer, prefix_text),
+        suffix_ids=list(tokenizer.encode(suffix_text, add_special_tokens=False)),
     )
 
-    refined = generated
-    if generated.startswith(prompt):
-        refined = generated[len(prompt) :]
+    # A tokenizer that merges across the user-turn boundaries would make the
+    # spliced ids differ from the unsplit prompt; render in full instead.
+    probe_ids = list(tokenizer.encode(_TEMPLATE_PROBE_TEXT, add_special_tokens=False))
+    full_ids = _encode_prompt_text(tokenizer, _render_chat_prompt(tokenizer, _TEMPLATE_PROBE_TEXT))
+    if template.prefix_ids + probe_ids + template.suffix_ids != full_ids:
+        logger.warning("prompt: chat template does not split cleanly; prefix caching disabled")
+        return None
+    return template
+
+
+def _token_id_prompts_enabled() -> bool:
+    """Build token-id prompts until stream_generate has rejected one."""
+    return _GENERATE_ACCEPTS_IDS is not False
+
+
+def _build_prompt(tokenizer: Any, raw_text: str) -> tuple[str | list[int], Any | None]:
+    """Return (prompt, prompt_cache); with a cache the prompt omits the cached prefix."""
+    template = _prompt_template(tokenizer)
+    if template is None:
+        return _render_chat_prompt(tokenizer, raw_text), None
+    if _token_id_prompts_enabled():
+        user_ids = list(tokenizer.encode(raw_text, add_special_tokens=False))
+        prompt_cache = LLMManager.prefix_cache(template.prefix_ids)
+        if prompt_cache is not None:
+            return user_ids + template.suffix_ids, prompt_cache
+        return template.prefix_ids + user_ids + template.suffix_ids, None
+    return template.prefix_text + raw_text + template.suffix_text, None
+
+
+def warm_llm(model_id: str) -> None:
+    """Load the LLM and prefill the system-prompt prefix ahead of the first request."""
+    _, tokenizer = LLMManager.get(model_id)
+    template = _prompt_template(tokenizer)
+    if template is not None and _token_id_prompts_enabled():
+        LLMManager.prefill(template.prefix_ids)
+
+
+def run_llm(
+    raw_text: str,
+    config: PipelineConfig,
+    on_text: Callable[[str], None] | None = None,
+) -> tuple[str, float]:
+    if not raw_text:
+        LLMManager.attention_status = "skipped"
+        return "", 0.0
 
-    refined = refined.strip()
+    t0 = time.perf_counter()
+    model, tokenizer = LLMManager.get(config.llm_model)
+    generated, prompt_cache = _generate_refinement(model, tokenizer, raw_text, config.max_tokens, on_text)
+    LLMManager.attention_status = _attention_path(prompt_cache)
+
+    refined = generated.strip()
     elapsed_ms = (time.perf_counter() - t0) * 1000
     return refined, elapsed_ms
 
 
+def _generate_refinement(
+    model: Any,
+    tokenizer: Any,
+    raw_text: str,
+    max_tokens: int,
+    on_text: Callable[[str], None] | None,
+) -> tuple[str, Any | None]:
+    """Decode the refinement; returns (text, prompt cache used or None).
+
+    Token-id prompts are tried first. Releases that only take string prompts
+    reject them before producing output, which switches this process over to
+    rendered-text prompts for good.
+    """
+    global _GENERATE_ACCEPTS_IDS
+    emitted = False
+
+    def forward(text: str) -> None:
+        nonlocal emitted
+        emitted = True
+        if on_text is not None:
+            on_text(text)
+
+    while True:
+        prompt, prompt_cache = _build_prompt(tokenizer, raw_text)
+        token_prompt = not isinstance(prompt, str)
+        if prompt_cache is None and token_prompt:
+            # Own the cache even without a prefix hit so its final type is visible.
+            prompt_cache = _new_prompt_cache(model)
+        try:
+            with _MLX_LOCK:
+                generated = _stream_generate_with_fallback(
+                    model=model,
+                    tokenizer=tokenizer,
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    prompt_cache=prompt_cache,
+                    on_text=forward,
+                )
+        except (TypeError, ValueError):
+            if not token_prompt or emitted or _GENERATE_ACCEPTS_IDS is not None:
+                raise
+            _GENERATE_ACCEPTS_IDS = False
+            logger.info("llm: stream_generate rejected token-id prompts; using rendered text")
+            continue
+        if token_prompt:
+            _GENERATE_ACCEPTS_IDS = True
+        return generated, prompt_cache
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="GhostType inference pipeline")
     parser.add_argument(
         "--audio",
-        required=True,
         help="Path to input audio file. 16kHz mono PCM16 WAV is preferred; other formats require ffmpeg.",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep models loaded and read length-prefixed JSON jobs from stdin",
+    )
     parser.add_argument(
         "--asr-model",
         default="mlx-community/whisper-small",
@@ -277,11 +697,188 @@ def parse_args() -> argparse.Namespace:
         default="json",
         help="Output format",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.serve and not args.audio:
+        parser.error("--audio is required unless --serve is given")
+    return args
+
+
+def _worker_pool() -> ThreadPoolExecutor:
+    global _WORKERS
+    if _WORKERS is None:
+        _WORKERS = ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix="ghosttype-mlx",
+            initializer=_apply_worker_qos,
+        )
+    return _WORKERS
+
+
+def run_pipeline(
+    config: PipelineConfig,
+    on_text: Callable[[str], None] | None = None,
+    overlap_llm_load: bool = False,
+) -> dict[str, Any]:
+    """Run ASR then refinement on the worker pool.
+
+    ``overlap_llm_load`` starts the LLM load alongside ASR. Only the resident
+    server sets it: a one-shot run would otherwise keep the process alive
+    until a load it may not need (empty transcript, ASR error) finishes.
+    """
+    pool = _worker_pool()
+    if config.skip_llm:
+        raw_text, asr_ms = pool.submit(run_asr, config).result()
+        refined_text = raw_text
+        llm_ms = 0.0
+    else:
+        # MLX evaluation on both sides of the overlap is serialized by
+        # _MLX_LOCK. A warmup failure is only surfaced when there is text to
+        # refine, and an ASR error returns without waiting for it.
+        warmup = pool.submit(warm_llm, config.llm_model) if overlap_llm_load else None
+        raw_text, asr_ms = pool.submit(run_asr, config).result()
+        if raw_text and warmup is not None:
+            warmup.result()
+        refined_text, llm_ms = pool.submit(run_llm, raw_text, config, on_text).result()
+        if not refined_text:
+            refined_text = raw_text
+
+    return {
+        "raw_text": raw_text,
+        "refined_text": refined_text,
+        "meta": {
+            "audio_path": str(config.audio_path),
+            "asr_model": config.asr_model,
+            "llm_model": None if config.skip_llm else config.llm_model,
+            "llm_attention": None if config.skip_llm else LLMManager.attention_status,
+            "timing_ms": {
+                "asr": round(asr_ms, 2),
+                "llm": round(llm_ms, 2),
+                "total": round(asr_ms + llm_ms, 2),
+            },
+        },
+    }
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_message(channel: Any) -> dict[str, Any] | None:
+    raw_length = channel.read(4)
+    if len(raw_length) != 4:
+        return None
+    msg_length = struct.unpack("<I", raw_length)[0]
+    raw_payload = channel.read(msg_length)
+    if len(raw_payload) != msg_length:
+        return None
+    try:
+        payload = _loads(raw_payload)
+    except Exception:
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    return payload
+
+
+def _send_message(channel: Any, message: dict[str, Any]) -> None:
+    data = _dumps(message)
+    channel.write(struct.pack("<I", len(data)))
+    channel.write(data)
+    channel.flush()
+
+
+def _job_config(message: dict[str, Any], defaults: argparse.Namespace) -> PipelineConfig:
+    audio = message.get("audio")
+    if not isinstance(audio, str) or not audio.strip():
+        raise ValueError("Job is missing 'audio'.")
+    audio_path = Path(audio).expanduser().resolve()
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    return PipelineConfig(
+        audio_path=audio_path,
+        asr_model=str(message.get("asr_model") or defaults.asr_model),
+        llm_model=str(message.get("llm_model") or defaults.llm_model),
+        language=str(message.get("language") or defaults.language),
+        max_tokens=int(message.get("max_tokens") or defaults.max_tokens),
+        skip_llm=bool(message.get("skip_llm", defaults.skip_llm)),
+    )
+
+
+def preload_models(asr_model: str, llm_model: str | None) -> None:
+    """Load the ASR and LLM weights ahead of the first job; failures are retried by it.
+
+    Both run on the worker pool so the LLM's file I/O overlaps the Whisper
+    load, while their MLX evaluation is serialized by _MLX_LOCK.
+    """
+    pool = _worker_pool()
+    futures = {"asr": pool.submit(ASRManager.get, asr_model)}
+    if llm_model:
+        futures["llm"] = pool.submit(warm_llm, llm_model)
+    for name, future in futures.items():
+        try:
+            future.result()
+        except Exception as exc:
+            logger.warning("preload: %s warmup failed: %s", name, exc)
+
+
+def _delta_sender(channel: Any) -> Callable[[str], None]:
+    def send(text: str) -> None:
+        _send_message(channel, {"ok": True, "event": "delta", "text": text})
+
+    return send
+
+
+def run_server(args: argparse.Namespace) -> int:
+    """Serve jobs over stdin/stdout with 4-byte little-endian length framing.
+
+    Each request is a JSON object with ``audio`` plus optional ``asr_model``,
+    ``llm_model``, ``language``, ``max_tokens`` and ``skip_llm`` overrides.
+    With ``"stream": true`` the refined text is also sent as it decodes, as
+    ``{"ok": true, "event": "delta", "text": ...}`` frames ahead of the final
+    ``"event": "result"`` payload; failures come back as ``"event": "error"``
+    frames with ``"ok": false``. The default models are loaded in parallel
+    before the first read and stay loaded between jobs; EOF on stdin ends
+    the loop.
+    """
+    # Frames own stdout; stray library prints are redirected to stderr.
+    channel = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    preload_models(args.asr_model, None if args.skip_llm else args.llm_model)
+    return _serve_jobs(args, sys.stdin.buffer, channel)
+
+
+def _serve_jobs(args: argparse.Namespace, reader: Any, channel: Any) -> int:
+    while True:
+        message = _read_message(reader)
+        if message is None:
+            return 0
+        on_text = _delta_sender(channel) if message.get("stream") else None
+        try:
+            config = _job_config(message, args)
+            payload = run_pipeline(config, on_text=on_text, overlap_llm_load=True)
+        except Exception as exc:
+            _send_message(channel, {"ok": False, "event": "error", "error": str(exc)})
+            continue
+        payload["ok"] = True
+        payload["event"] = "result"
+        _send_message(channel, payload)
 
 
 def main() -> int:
     args = parse_args()
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="[%(name)s] %(levelname)s %(message)s")
+    if args.serve:
+        return run_server(args)
+
     audio_path = Path(args.audio).expanduser().resolve()
     if not audio_path.exists():
         print(f"Audio file not found: {audio_path}", file=sys.stderr)
@@ -296,41 +893,16 @@ def main() -> int:
         skip_llm=args.skip_llm,
     )
 
-    scheduling = apply_background_scheduling()
-
     try:
-        raw_text, asr_ms = run_asr(config)
-        if config.skip_llm:
-            refined_text = raw_text
-            llm_ms = 0.0
-        else:
-            refined_text, llm_ms = run_llm(raw_text, config)
-            if not refined_text:
-                refined_text = raw_text
+        payload = run_pipeline(config)
     except Exception as exc:
         print(f"Pipeline failed: {exc}", file=sys.stderr)
         return 1
 
-    payload = {
-        "raw_text": raw_text,
-        "refined_text": refined_text,
-        "meta": {
-            "audio_path": str(audio_path),
-            "asr_model": config.asr_model,
-            "llm_model": None if config.skip_llm else config.llm_model,
-            "timing_ms": {
-                "asr": round(asr_ms, 2),
-                "llm": round(llm_ms, 2),
-                "total": round(asr_ms + llm_ms, 2),
-            },
-            "scheduling": scheduling,
-        },
-    }
-
     if args.output == "text":
-        print(refined_text)
+        print(payload["refined_text"])
     else:
-        print(json.dumps(payload, ensure_ascii=False))
+        print(_dumps(payload).decode("utf-8"))
     return 0
 
 
@@ -84,6 +84,8 @@ except Exception:  # pragma: no cover - fallback when module is unavailable
             "rnnoise": False,
             "deepfilternet": False,
             "speexdsp": False,
+            "numba": False,
+            "scipy": False,
             "ffmpeg": False,
         }
 
@@ -303,28 +305,17 @@ def apply_background_scheduling() -> dict[str, str]:
         status["nice"] = f"not_set ({exc})"
 
     if sys.platform == "darwin":
-        pid = str(os.getpid())
+        # Same effect as `taskpolicy -b -p <pid>`, without forking a helper:
+        # setpriority(PRIO_DARWIN_PROCESS, 0, PRIO_DARWIN_BG).
         try:
-            subprocess.run(
-                ["/usr/bin/renice", "10", "-p", pid],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
+            os.setpriority(
+                getattr(os, "PRIO_DARWIN_PROCESS", 4),
+                0,
+                getattr(os, "PRIO_DARWIN_BG", 0x1000),
             )
-            status["renice"] = "applied"
-        except FileNotFoundError:
-            status["renice"] = "missing"
-
-        try:
-            subprocess.run(
-                ["/usr/sbin/taskpolicy", "-b", "-p", pid],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            status["taskpolicy"] = "background_applied"
-        except FileNotFoundError:
-            status["taskpolicy"] = "missing"
+            status["darwin_bg"] = "applied"
+        except (AttributeError, OSError) as exc:
+            status["darwin_bg"] = f"not_set ({exc})"
 
     return status
 
@@ -428,6 +419,8 @@ class ResidentModelRuntime:
         self._style_learning_idle_grace_seconds = 20.0
         self._scheduling = apply_background_scheduling()
         self._enhancement_plugins = probe_enhancement_plugins()
+        # Reused across requests (serialised by _inference_lock) so its scratch buffers persist.
+        self._enhancement_engine: Any | None = None
         self._ffmpeg_path: str | None = None
         self._ffmpeg_source = "none"
         self._transcribe_accepts_ndarray: bool | None = None
@@ -450,6 +443,29 @@ class ResidentModelRuntime:
             daemon=True,
         )
         self._watchdog_thread.start()
+        if EnhancementEngine is not None:
+            threading.Thread(
+                target=self._warm_enhancement_engine,
+                name="ghosttype-enhancement-warmup",
+                daemon=True,
+            ).start()
+
+    def _warm_enhancement_engine(self) -> None:
+        # Run one short process() so numba compiles (or loads from its on-disk
+        # cache) the enhancement kernels before the first dictation needs them.
+        rng = np.random.default_rng(0)
+        signal = (rng.standard_normal(8000) * 0.01).astype(np.float32)
+        try:
+            with self._inference_lock:
+                engine = self._enhancement_engine
+                if engine is None:
+                    engine = EnhancementEngine(EnhancementV2Config(ns_engine="off"))
+                    self._enhancement_engine = engine
+                else:
+                    engine.config = EnhancementV2Config(ns_engine="off")
+                engine.process(signal=signal, sample_rate=16000)
+        except Exception as exc:
+            print(f"[enhancement-warmup] failed: {exc}", flush=True)
 
     def stop(self) -> None:
         self._shutdown.set()
@@ -1749,7 +1765,12 @@ class ResidentModelRuntime:
             return legacy_signal, legacy_stats
 
         try:
-            engine = EnhancementEngine(v2_config)
+            engine = self._enhancement_engine
+            if engine is None:
+                engine = EnhancementEngine(v2_config)
+                self._enhancement_engine = engine
+            else:
+                engine.config = v2_config
             result = engine.process(signal=signal, sample_rate=16000, speech_mask=speech_mask)
             stats = dict(result.stats)
             stats["v2_backend"] = "enhancement_engine_v2"
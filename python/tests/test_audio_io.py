@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import io
 from pathlib import Path
-import tempfile
+import struct
 import unittest
 import wave
 
@@ -13,6 +14,30 @@ from audio_io import WavFormatError, load_wav_pcm16_mono
 FIXTURE_WAV = Path(__file__).resolve().parent / "fixtures" / "mono16k_pcm16.wav"
 
 
+def _riff_wav(
+    format_tag: int,
+    payload: bytes,
+    extra_chunks: list[tuple[bytes, bytes]] | None = None,
+) -> bytes:
+    fmt_payload = struct.pack("<HHIIHH", format_tag, 1, 16_000, 32_000, 2, 16)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt_payload)) + fmt_payload
+    for chunk_id, chunk_payload in extra_chunks or []:
+        body += chunk_id + struct.pack("<I", len(chunk_payload)) + chunk_payload
+    body += b"data" + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _wave_buffer(channels: int, sample_rate: int, frames: bytes) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(frames)
+    buffer.seek(0)
+    return buffer
+
+
 class AudioIOTests(unittest.TestCase):
     def test_load_wav_pcm16_mono_returns_float32_waveform(self):
         waveform = load_wav_pcm16_mono(FIXTURE_WAV)
@@ -22,30 +47,53 @@ class AudioIOTests(unittest.TestCase):
         self.assertLessEqual(float(np.max(waveform)), 1.0)
         self.assertGreaterEqual(float(np.min(waveform)), -1.0)
 
-    def test_load_wav_pcm16_mono_rejects_non_mono(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            bad_wav = Path(temp_dir) / "stereo.wav"
-            with wave.open(str(bad_wav), "wb") as wf:
-                wf.setnchannels(2)
-                wf.setsampwidth(2)
-                wf.setframerate(16_000)
-                wf.writeframes(b"\x00\x00" * 100)
+    def test_load_wav_pcm16_mono_accepts_file_objects(self):
+        expected = load_wav_pcm16_mono(FIXTURE_WAV)
+        payload = FIXTURE_WAV.read_bytes()
+
+        from_bytes = load_wav_pcm16_mono(io.BytesIO(payload))
+        with FIXTURE_WAV.open("rb") as fh:
+            from_file = load_wav_pcm16_mono(fh)
+
+        np.testing.assert_array_equal(from_bytes, expected)
+        np.testing.assert_array_equal(from_file, expected)
 
-            with self.assertRaises(WavFormatError):
-                load_wav_pcm16_mono(bad_wav)
+    def test_load_wav_pcm16_mono_writes_into_caller_buffer(self):
+        expected = load_wav_pcm16_mono(FIXTURE_WAV)
+        buffer = np.full(expected.size + 10, 7.0, dtype=np.float32)
+
+        waveform = load_wav_pcm16_mono(FIXTURE_WAV, out=buffer)
+        too_small = load_wav_pcm16_mono(FIXTURE_WAV, out=np.empty(expected.size - 1, dtype=np.float32))
+
+        self.assertTrue(np.shares_memory(waveform, buffer))
+        np.testing.assert_array_equal(waveform, expected)
+        np.testing.assert_array_equal(buffer[expected.size :], 7.0)
+        np.testing.assert_array_equal(too_small, expected)
+
+    def test_load_wav_pcm16_mono_rejects_non_mono(self):
+        with self.assertRaises(WavFormatError):
+            load_wav_pcm16_mono(_wave_buffer(2, 16_000, b"\x00\x00" * 100))
 
     def test_load_wav_pcm16_mono_rejects_non_16k(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            bad_wav = Path(temp_dir) / "sr8k.wav"
-            with wave.open(str(bad_wav), "wb") as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(8_000)
-                wf.writeframes(b"\x00\x00" * 100)
+        with self.assertRaises(WavFormatError):
+            load_wav_pcm16_mono(_wave_buffer(1, 8_000, b"\x00\x00" * 100))
+
+    def test_load_wav_pcm16_mono_skips_chunks_before_data(self):
+        samples = np.array([0, 16_384, -16_384, 32_767, -32_768], dtype="<i2")
+        list_payload = b"INFOISFT\x05\x00\x00\x00test\x00\x00"
+        wav_bytes = _riff_wav(1, samples.tobytes(), extra_chunks=[(b"LIST", list_payload)])
+
+        waveform = load_wav_pcm16_mono(io.BytesIO(wav_bytes))
+
+        np.testing.assert_array_equal(waveform, samples.astype(np.float32) / 32768.0)
 
-            with self.assertRaises(WavFormatError):
-                load_wav_pcm16_mono(bad_wav)
+    def test_load_wav_pcm16_mono_rejects_float_encoding(self):
+        with self.assertRaises(WavFormatError):
+            load_wav_pcm16_mono(io.BytesIO(_riff_wav(3, b"\x00\x00" * 100)))
 
+    def test_load_wav_pcm16_mono_raises_wave_error_for_non_riff_file(self):
+        with self.assertRaises(wave.Error):
+            load_wav_pcm16_mono(io.BytesIO(b"not a wav file"))
 
 if __name__ == "__main__":
     unittest.main()
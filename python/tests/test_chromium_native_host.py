@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+from pathlib import Path
+import struct
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+
+_HOST_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "chromium_native_host.py"
+
+
+def _load_host_module():
+    spec = importlib.util.spec_from_file_location("chromium_native_host", _HOST_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+native_host = _load_host_module()
+
+
+# (input, expected domain, whether the regex fast path should accept it)
+_DOMAIN_CASES = [
+    ("example.com", "example.com", True),
+    ("  Example.COM  ", "example.com", True),
+    ("HTTPS://WWW.EXAMPLE.COM/Path", "www.example.com", True),
+    ("https://docs.python.org/3/library/re.html?x=1#y", "docs.python.org", True),
+    ("example.com/path?q=1", "example.com", True),
+    ("example.com:8443/path", "example.com", True),
+    ("localhost:3000", "localhost", True),
+    ("http://localhost:", "localhost", True),
+    ("https://user:pw@Mail.Example.com:993/inbox", "mail.example.com", True),
+    ("user@host.example", "host.example", True),
+    ("mailto:someone@Example.org", "example.org", True),
+    ("chrome-extension://abcdefghijklmnop/popup.html", "abcdefghijklmnop", True),
+    ("192.168.1.10:8080/admin", "192.168.1.10", True),
+    ("[::1]", "::1", False),
+    ("[::1]:8080/status", "::1", False),
+    ("http://[2001:DB8::1]:443/", "2001:db8::1", False),
+    ("https://user@[fe80::1]/", "fe80::1", False),
+    ("//cdn.example.net/lib.js", "cdn.example.net", False),
+    ("https://exa\tmple.com/", "example.com", False),
+    ("https://bücher.example/", "bücher.example", False),
+    ("", None, False),
+    ("   ", None, False),
+    ("https://", None, False),
+    ("file:///tmp/index.html", None, False),
+]
+
+
+class ExtractDomainTests(unittest.TestCase):
+    def test_fast_and_slow_paths_agree(self):
+        for value, expected, fast in _DOMAIN_CASES:
+            with self.subTest(value=value):
+                candidate = value.strip()
+                match = native_host._HOST_RE.match(candidate) if candidate else None
+                self.assertEqual(match is not None, fast)
+                if match is not None:
+                    self.assertEqual(match.group(1).lower(), native_host._extract_domain_slow(candidate))
+                elif candidate:
+                    self.assertEqual(native_host._extract_domain_slow(candidate), expected)
+                self.assertEqual(native_host._extract_domain(value), expected)
+
+
+class InboxQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # A fresh module per test gives each one clean debounce state.
+        self.host = _load_host_module()
+        self.writes: list[tuple[str, str]] = []
+        self.fail_writes = False
+        self.written = threading.Event()
+
+        def fake_write(bundle_id: str, domain: str) -> None:
+            if self.fail_writes:
+                raise OSError("disk full")
+            self.writes.append((bundle_id, domain))
+            self.written.set()
+
+        patcher = mock.patch.object(self.host, "_write_inbox", side_effect=fake_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.host._shutdown_inbox)
+
+    def _wait_for_write(self) -> None:
+        self.assertTrue(self.written.wait(2.0))
+        self.written.clear()
+
+    def test_rapid_messages_collapse_into_one_write_on_one_thread(self):
+        threads_before = threading.active_count()
+        for domain in ("a.example", "b.example", "c.example"):
+            self.assertIsNone(self.host._queue_inbox("com.google.Chrome", domain))
+        self._wait_for_write()
+
+        self.assertEqual(self.writes, [("com.google.Chrome", "c.example")])
+        self.assertEqual(threading.active_count(), threads_before + 1)
+
+    def test_unchanged_pair_is_rewritten_once_stale(self):
+        self.host._queue_inbox("com.google.Chrome", "example.com")
+        self._wait_for_write()
+
+        self.host._queue_inbox("com.google.Chrome", "example.com")
+        self.assertIsNone(self.host._PENDING_PAIR)
+
+        with self.host._WRITE_CONDITION:
+            self.host._LAST_WRITTEN_AT = time.monotonic() - self.host.INBOX_REFRESH_SECONDS - 1.0
+        self.host._queue_inbox("com.google.Chrome", "example.com")
+        self._wait_for_write()
+
+        self.assertEqual(self.writes, [("com.google.Chrome", "example.com")] * 2)
+
+    def test_write_failure_names_the_failed_pair_and_is_retried(self):
+        self.fail_writes = True
+        self.host._queue_inbox("com.google.Chrome", "failed.example")
+        deadline = time.monotonic() + 2.0
+        while self.host._WRITE_ERROR is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.fail_writes = False
+        warning = self.host._queue_inbox("com.google.Chrome", "next.example")
+        self._wait_for_write()
+
+        self.assertIn("failed.example", warning)
+        self.assertIn("disk full", warning)
+        self.assertEqual(self.writes, [("com.google.Chrome", "next.example")])
+        self.assertIsNone(self.host._queue_inbox("com.google.Chrome", "failed.example"))
+        self._wait_for_write()
+        self.assertEqual(self.writes[-1], ("com.google.Chrome", "failed.example"))
+
+    def test_main_acks_current_pair_and_carries_earlier_failure_as_warning(self):
+        request = b'{"domain": "next.example", "browser": "chrome"}'
+        stdin = io.BytesIO(struct.pack("<I", len(request)) + request)
+        stdout = io.BytesIO()
+        fake_sys = types.SimpleNamespace(
+            stdin=types.SimpleNamespace(buffer=stdin),
+            stdout=types.SimpleNamespace(buffer=stdout),
+            stderr=io.StringIO(),
+        )
+        warning = "Inbox write failed for failed.example (com.google.Chrome): disk full"
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(self.host, "sys", fake_sys), mock.patch.object(
+            self.host, "APP_SUPPORT_DIR", Path(temp_dir)
+        ), mock.patch.object(self.host, "_queue_inbox", return_value=warning):
+            self.assertEqual(self.host.main(), 0)
+
+        ack = json.loads(stdout.getvalue()[4:])
+        self.assertTrue(ack["ok"])
+        self.assertEqual(ack["activeDomain"], "next.example")
+        self.assertEqual(ack["warning"], warning)
+
+    def test_shutdown_flushes_pending_pair(self):
+        with mock.patch.object(self.host, "INBOX_DEBOUNCE_SECONDS", 60.0):
+            self.host._queue_inbox("com.google.Chrome", "example.com")
+            self.host._shutdown_inbox()
+
+        self.assertEqual(self.writes, [("com.google.Chrome", "example.com")])
+
+
+if __name__ == "__main__":
+    unittest.main()
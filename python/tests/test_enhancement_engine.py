@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import enhancement_engine
+from enhancement_engine import EnhancementEngine, EnhancementV2Config
+
+
+def _test_signal(size: int = 16_000, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(size, dtype=np.float32) / 16_000.0
+    tone = 0.05 * np.sin(2.0 * np.pi * 220.0 * t)
+    noise = 0.01 * rng.standard_normal(size)
+    return (tone + noise + 0.02).astype(np.float32)
+
+
+class _EchoAPM:
+    """Stand-in for the WebRTC APM binding that returns each frame unchanged."""
+
+    def __init__(self, **kwargs: object) -> None:
+        self.frames: list[bytes] = []
+
+    def set_stream_format(self, *args: object) -> None:
+        pass
+
+    def set_ns_level(self, level: int) -> None:
+        pass
+
+    def set_agc_target(self, target: int) -> None:
+        pass
+
+    def set_agc_level(self, level: int) -> None:
+        pass
+
+    def process_stream(self, payload: bytes) -> bytes:
+        self.frames.append(payload)
+        return payload
+
+
+class _HalfFrameAPM(_EchoAPM):
+    def process_stream(self, payload: bytes) -> bytes:
+        return payload[: len(payload) // 2]
+
+
+class EnhancementEngineTests(unittest.TestCase):
+    def test_dc_hpf_stage_matches_clip_center_and_reference_recursion(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal()
+        signal[100] = 1.5
+
+        output, stats = engine._apply_dc_hpf_stage(signal, 80.0, 16_000)
+
+        clipped = np.clip(signal, -1.0, 1.0)
+        dc = float(np.mean(clipped))
+        centered = clipped - dc
+        dt = 1.0 / 16_000.0
+        rc = 1.0 / (2.0 * math.pi * 80.0)
+        alpha = rc / (rc + dt)
+        expected = np.empty_like(signal)
+        expected[0] = centered[0]
+        for i in range(1, signal.size):
+            expected[i] = alpha * (expected[i - 1] + centered[i] - centered[i - 1])
+
+        self.assertTrue(stats["hpf_enabled"])
+        self.assertAlmostEqual(stats["dc_offset_removed"], round(dc, 6), places=5)
+        self.assertEqual(output.dtype, np.float32)
+        np.testing.assert_allclose(output, expected, atol=1e-5)
+
+    def test_dc_hpf_stage_only_centers_when_hpf_disabled(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal()
+
+        output, stats = engine._apply_dc_hpf_stage(signal, 0.0, 16_000)
+
+        self.assertFalse(stats["hpf_enabled"])
+        np.testing.assert_allclose(output, signal - np.mean(signal), atol=1e-6)
+
+    def test_dc_hpf_stage_without_numba_matches_fused_kernel(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal()
+        signal[100] = 1.5
+        expected, expected_stats = engine._apply_dc_hpf_stage(signal, 80.0, 16_000)
+
+        kernel = getattr(enhancement_engine._high_pass_kernel, "py_func", enhancement_engine._high_pass_kernel)
+        with mock.patch.object(enhancement_engine, "numba", None), mock.patch.object(
+            enhancement_engine, "_high_pass_kernel", kernel
+        ):
+            output, stats = engine._apply_dc_hpf_stage(signal, 80.0, 16_000)
+
+        self.assertEqual(stats, expected_stats)
+        self.assertEqual(output.dtype, np.float32)
+        np.testing.assert_allclose(output, expected, atol=1e-5)
+
+    def test_upward_compressor_matches_reference_gain_curve(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal()
+
+        output, stats = engine._apply_upward_compressor(signal)
+
+        attack = math.exp(-1.0 / (0.020 * 16_000.0))
+        release = math.exp(-1.0 / (0.250 * 16_000.0))
+        max_gain = 10.0 ** (18.0 / 20.0)
+        env = 0.0
+        gains = np.empty(signal.size, dtype=np.float64)
+        for i, sample in enumerate(signal):
+            level = abs(float(sample))
+            coef = attack if level > env else release
+            env = coef * env + (1.0 - coef) * level
+            gain = (0.125 / max(env, 1e-5)) ** 0.5 if env < 0.125 else 1.0
+            gains[i] = min(max(gain, 1.0), max_gain)
+
+        np.testing.assert_allclose(output, signal * gains, rtol=1e-4, atol=1e-6)
+        self.assertAlmostEqual(
+            stats["upward_comp_avg_gain_db"],
+            round(20.0 * math.log10(float(np.mean(gains))), 2),
+            places=2,
+        )
+        self.assertAlmostEqual(
+            stats["upward_comp_peak_gain_db"],
+            round(20.0 * math.log10(float(np.max(gains))), 2),
+            places=2,
+        )
+
+    def test_limiter_clips_output_and_reports_min_gain_reduction(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = (_test_signal() * 30.0).astype(np.float32)
+
+        output, stats = engine._apply_limiter(signal)
+
+        attack = math.exp(-1.0 / (0.005 * 16_000.0))
+        release = math.exp(-1.0 / (0.050 * 16_000.0))
+        gain = 1.0
+        gains = np.empty(signal.size, dtype=np.float64)
+        for i, sample in enumerate(signal):
+            level = abs(float(sample))
+            target_gain = 1.0 if level <= 0.98 else 0.98 / level
+            coef = attack if target_gain < gain else release
+            gain = coef * gain + (1.0 - coef) * target_gain
+            gains[i] = gain
+
+        np.testing.assert_allclose(output, np.clip(signal * gains, -1.0, 1.0), rtol=1e-4, atol=1e-6)
+        self.assertLessEqual(float(np.max(np.abs(output))), 1.0)
+        self.assertAlmostEqual(
+            stats["limiter_reduction_db"],
+            round(-20.0 * math.log10(float(np.min(gains))), 2),
+            places=2,
+        )
+
+    def test_noise_suppression_frames_padded_pcm16_payloads(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal(size=1_650)
+
+        with mock.patch.object(enhancement_engine, "WebRTCAudioProcessingModule", _EchoAPM):
+            output, stats = engine._apply_noise_suppression(signal.copy(), 16_000)
+
+        self.assertEqual(stats["ns_backend"], "webrtc_apm")
+        self.assertEqual(stats["ns_frames_processed"], 11)
+        self.assertEqual(output.shape, signal.shape)
+        self.assertEqual(output.dtype, np.float32)
+        np.testing.assert_allclose(output, signal, atol=1.0 / 16_384.0)
+
+    def test_noise_suppression_zero_fills_short_output_frames(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal(size=480)
+
+        with mock.patch.object(enhancement_engine, "WebRTCAudioProcessingModule", _HalfFrameAPM):
+            output, stats = engine._apply_noise_suppression(signal.copy(), 16_000)
+
+        frames = output.reshape(3, 160)
+        self.assertEqual(stats["ns_frames_processed"], 3)
+        np.testing.assert_array_equal(frames[:, 80:], 0.0)
+        np.testing.assert_allclose(frames[:, :80], signal.reshape(3, 160)[:, :80], atol=1.0 / 16_384.0)
+
+    def test_smooth_curve_matches_explicit_kernel_fallback(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        values = np.random.default_rng(3).uniform(1.0, 4.0, 40).astype(np.float32)
+
+        smoothed = engine._smooth_curve(values, window=13)
+        with mock.patch.object(enhancement_engine, "gaussian_filter1d", None):
+            fallback = engine._smooth_curve(values, window=13)
+
+        self.assertEqual(smoothed.dtype, np.float32)
+        np.testing.assert_allclose(smoothed, fallback, atol=1e-5)
+
+    def test_dynaudnorm_frame_gains_match_per_frame_reference(self):
+        engine = EnhancementEngine(EnhancementV2Config(mode="fast_dsp"))
+        signal = _test_signal(size=10_500)
+        signal[8_000:] *= 0.001
+
+        work = signal.copy()
+        output, stats = engine._apply_dynaudnorm_like(work, 16_000, None)
+
+        frame_len = 4_000
+        gate_db = engine._estimate_noise_floor_db(signal) + 8.0
+        gains = []
+        for start in range(0, signal.size, frame_len):
+            frame = signal[start : start + frame_len]
+            rms_db = 20.0 * math.log10(max(float(np.sqrt(np.mean(np.square(frame, dtype=np.float64)))), 1e-7))
+            if rms_db < gate_db:
+                gains.append(1.0)
+            else:
+                gains.append(min(max(0.95 / max(float(np.max(np.abs(frame))), 1e-5), 1.0), 10.0 ** 0.5))
+        smoothed = engine._smooth_curve(np.array(gains, dtype=np.float32), window=13)
+        expected = signal * np.repeat(smoothed, frame_len)[: signal.size]
+
+        self.assertEqual(stats["loudness_backend"], "dynaudnorm_like")
+        self.assertIs(output, work)
+        np.testing.assert_allclose(output, expected, rtol=1e-5, atol=1e-7)
+
+    def test_in_place_stages_match_allocating_path(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = (_test_signal() * 30.0).astype(np.float32)
+
+        expected_comp, _ = engine._apply_upward_compressor(signal)
+        expected_limited, _ = engine._apply_limiter(signal)
+        work = signal.copy()
+        compressed, _ = engine._apply_upward_compressor(work, out=work)
+        self.assertIs(compressed, work)
+        np.testing.assert_array_equal(compressed, expected_comp)
+        work = signal.copy()
+        limited, _ = engine._apply_limiter(work, out=work)
+        self.assertIs(limited, work)
+        np.testing.assert_array_equal(limited, expected_limited)
+
+    def test_process_reuses_scratch_without_aliasing_results(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        first_input = _test_signal(size=1_650, seed=1)
+        second_input = _test_signal(size=800, seed=2)
+
+        with mock.patch.object(enhancement_engine, "WebRTCAudioProcessingModule", _EchoAPM):
+            first = engine.process(first_input, 16_000)
+            first_signal = first.signal.copy()
+            scratch = engine._scratch["ns_pcm_in"]
+            second = engine.process(second_input, 16_000)
+            fresh = EnhancementEngine(EnhancementV2Config()).process(second_input, 16_000)
+
+        self.assertIs(engine._scratch["ns_pcm_in"], scratch)
+        np.testing.assert_array_equal(first.signal, first_signal)
+        np.testing.assert_array_equal(second.signal, fresh.signal)
+        self.assertEqual(second.stats, fresh.stats)
+
+    def test_noise_floor_matches_interpolated_twentieth_percentile(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        for size in (1, 2, 7, 1_001, 16_000):
+            signal = _test_signal(size=size, seed=size)
+            expected = 20.0 * math.log10(max(float(np.percentile(np.abs(signal), 20)), 1e-7))
+
+            self.assertAlmostEqual(engine._estimate_noise_floor_db(signal), expected, places=4)
+
+    def test_rms_dbfs_matches_float64_reference_across_blocks(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = _test_signal(size=200_003)
+        expected = 20.0 * math.log10(float(np.sqrt(np.mean(np.square(signal, dtype=np.float64)))))
+
+        self.assertAlmostEqual(engine._estimate_rms_dbfs(signal), expected, places=4)
+        self.assertEqual(engine._estimate_rms_dbfs(np.zeros(0, dtype=np.float32)), -120.0)
+
+    def test_measure_output_matches_separate_reductions(self):
+        engine = EnhancementEngine(EnhancementV2Config())
+        signal = (_test_signal() * 25.0).clip(-1.0, 1.0).astype(np.float32)
+
+        rms_dbfs, peak_dbfs, clipping_ratio = engine._measure_output(signal)
+
+        self.assertAlmostEqual(rms_dbfs, engine._estimate_rms_dbfs(signal), places=4)
+        self.assertAlmostEqual(peak_dbfs, engine._estimate_peak_dbfs(signal), places=5)
+        self.assertAlmostEqual(clipping_ratio, float(np.mean(np.abs(signal) >= 0.999)), places=9)
+        self.assertGreater(clipping_ratio, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,690 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+from pathlib import Path
+import re
+import struct
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import inference_pipeline
+from audio_io import WavFormatError
+from inference_pipeline import PipelineConfig
+
+
+FIXTURE_WAV = Path(__file__).resolve().parent / "fixtures" / "mono16k_pcm16.wav"
+
+
+def _frame(message: object) -> bytes:
+    payload = json.dumps(message).encode("utf-8")
+    return struct.pack("<I", len(payload)) + payload
+
+
+def _read_frames(data: bytes) -> list[dict[str, object]]:
+    frames = []
+    offset = 0
+    while offset < len(data):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        frames.append(json.loads(data[offset : offset + length]))
+        offset += length
+    return frames
+
+
+class _CharTokenizer:
+    """Chat-template tokenizer stand-in: special tokens are atomic, other text is one id per char."""
+
+    _SPECIAL = ("<|im_start|>", "<|im_end|>")
+
+    def __init__(self, bos_token: str | None = None) -> None:
+        self.bos_token = bos_token
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False) -> str:
+        rendered = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        return rendered + ("<|im_start|>assistant\n" if add_generation_prompt else "")
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> list[int]:
+        ids = [1] if add_special_tokens and self.bos_token is not None else []
+        for piece in re.split(r"(<\|im_start\|>|<\|im_end\|>)", text):
+            if piece in self._SPECIAL:
+                ids.append(100_000 + self._SPECIAL.index(piece))
+            else:
+                ids.extend(self._encode_plain(piece))
+        return ids
+
+    def _encode_plain(self, text: str) -> list[int]:
+        return [ord(char) for char in text]
+
+
+class _MergingTokenizer(_CharTokenizer):
+    """Merges a newline with the character after it, so splits at "\n" change the ids."""
+
+    def _encode_plain(self, text: str) -> list[int]:
+        ids = []
+        index = 0
+        while index < len(text):
+            if text[index] == "\n" and index + 1 < len(text):
+                ids.append(200_000 + ord(text[index + 1]))
+                index += 2
+            else:
+                ids.append(ord(text[index]))
+                index += 1
+        return ids
+
+
+def _server_args() -> argparse.Namespace:
+    return argparse.Namespace(
+        asr_model="asr-default",
+        llm_model="llm-default",
+        language="auto",
+        max_tokens=64,
+        skip_llm=False,
+    )
+
+
+class ServerFramingTests(unittest.TestCase):
+    def test_read_message_handles_frames_truncation_and_bad_json(self):
+        reader = io.BytesIO(
+            _frame({"audio": "a.wav"})
+            + _frame(["not", "an", "object"])
+            + struct.pack("<I", 3)
+            + b"{{{"
+            + struct.pack("<I", 10)
+            + b"short"
+        )
+
+        self.assertEqual(inference_pipeline._read_message(reader), {"audio": "a.wav"})
+        self.assertEqual(inference_pipeline._read_message(reader), {})
+        self.assertEqual(inference_pipeline._read_message(reader), {})
+        self.assertIsNone(inference_pipeline._read_message(reader))
+        self.assertIsNone(inference_pipeline._read_message(io.BytesIO(b"\x01\x00")))
+
+    def test_send_message_writes_little_endian_length_prefix(self):
+        writer = io.BytesIO()
+
+        inference_pipeline._send_message(writer, {"ok": True, "text": "你好"})
+
+        data = writer.getvalue()
+        (length,) = struct.unpack_from("<I", data)
+        self.assertEqual(length, len(data) - 4)
+        self.assertEqual(json.loads(data[4:]), {"ok": True, "text": "你好"})
+
+    def test_job_config_applies_overrides_and_defaults(self):
+        config = inference_pipeline._job_config(
+            {"audio": str(FIXTURE_WAV), "llm_model": "llm-override", "skip_llm": True},
+            _server_args(),
+        )
+
+        self.assertEqual(config.audio_path, FIXTURE_WAV.resolve())
+        self.assertEqual(config.asr_model, "asr-default")
+        self.assertEqual(config.llm_model, "llm-override")
+        self.assertEqual(config.max_tokens, 64)
+        self.assertTrue(config.skip_llm)
+
+    def test_job_config_rejects_missing_audio(self):
+        with self.assertRaises(ValueError):
+            inference_pipeline._job_config({}, _server_args())
+        with self.assertRaises(FileNotFoundError):
+            inference_pipeline._job_config({"audio": "/nonexistent/clip.wav"}, _server_args())
+
+    def test_serve_jobs_streams_deltas_then_result_and_reports_errors(self):
+        def fake_pipeline(config: PipelineConfig, on_text=None, overlap_llm_load=False) -> dict[str, object]:
+            self.assertTrue(overlap_llm_load)
+            if on_text is not None:
+                on_text("Hello")
+                on_text(" world")
+            return {"raw_text": "hello world", "refined_text": "Hello world", "meta": {}}
+
+        reader = io.BytesIO(
+            _frame({"audio": str(FIXTURE_WAV), "stream": True})
+            + _frame({"stream": True})
+            + _frame({"audio": str(FIXTURE_WAV)})
+        )
+        writer = io.BytesIO()
+
+        with mock.patch.object(inference_pipeline, "run_pipeline", side_effect=fake_pipeline):
+            status = inference_pipeline._serve_jobs(_server_args(), reader, writer)
+
+        frames = _read_frames(writer.getvalue())
+        self.assertEqual(status, 0)
+        self.assertEqual([frame["event"] for frame in frames], ["delta", "delta", "result", "error", "result"])
+        self.assertEqual([frame["text"] for frame in frames[:2]], ["Hello", " world"])
+        self.assertEqual(frames[2]["refined_text"], "Hello world")
+        self.assertTrue(frames[2]["ok"])
+        self.assertFalse(frames[3]["ok"])
+        self.assertIn("audio", frames[3]["error"])
+        self.assertTrue(frames[4]["ok"])
+
+
+class PromptTemplateTests(unittest.TestCase):
+    def _full_ids(self, tokenizer: _CharTokenizer, user_text: str) -> list[int]:
+        rendered = tokenizer.apply_chat_template(
+            inference_pipeline._chat_messages(user_text),
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+        return inference_pipeline._encode_prompt_text(tokenizer, rendered)
+
+    def test_split_template_ids_match_unsplit_chat_template(self):
+        for tokenizer in (_CharTokenizer(), _CharTokenizer(bos_token="<s>")):
+            template = inference_pipeline._prompt_template(tokenizer)
+            self.assertIsNotNone(template)
+            user_text = "明天去超市，算了 — just milk."
+            user_ids = tokenizer.encode(user_text, add_special_tokens=False)
+
+            self.assertEqual(
+                template.prefix_ids + user_ids + template.suffix_ids,
+                self._full_ids(tokenizer, user_text),
+            )
+            self.assertIs(inference_pipeline._prompt_template(tokenizer), template)
+
+    def test_build_prompt_token_ids_match_unsplit_chat_template(self):
+        tokenizer = _CharTokenizer(bos_token="<s>")
+        with mock.patch.object(inference_pipeline, "_token_id_prompts_enabled", return_value=True), mock.patch.object(
+            inference_pipeline.LLMManager, "prefix_cache", return_value=None
+        ):
+            prompt, prompt_cache = inference_pipeline._build_prompt(tokenizer, "hello there")
+
+        self.assertIsNone(prompt_cache)
+        self.assertEqual(prompt, self._full_ids(tokenizer, "hello there"))
+
+    def test_build_prompt_renders_in_full_when_split_changes_tokens(self):
+        tokenizer = _MergingTokenizer()
+
+        self.assertIsNone(inference_pipeline._prompt_template(tokenizer))
+        with mock.patch.object(inference_pipeline, "_token_id_prompts_enabled", return_value=True):
+            prompt, prompt_cache = inference_pipeline._build_prompt(tokenizer, "hello")
+
+        self.assertIsNone(prompt_cache)
+        self.assertEqual(
+            prompt,
+            tokenizer.apply_chat_template(
+                inference_pipeline._chat_messages("hello"),
+                tokenize=False,
+                add_generation_prompt=True,
+            ),
+        )
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _FakeStreamGenerate:
+    """Records each call and rejects the given sampling kwargs like an older mlx-lm would."""
+
+    def __init__(self, rejected: set[str], pieces: tuple[str, ...] = ("Hi", "", " there")) -> None:
+        self.rejected = rejected
+        self.pieces = pieces
+        self.calls: list[dict[str, object]] = []
+
+    def __call__(self, model, tokenizer, prompt, max_tokens, **kwargs):
+        self.calls.append(kwargs)
+        unexpected = self.rejected.intersection(kwargs)
+        if unexpected:
+            raise TypeError(f"unexpected keyword argument {sorted(unexpected)[0]!r}")
+        for piece in self.pieces:
+            yield _Response(piece)
+
+
+class StreamGenerateFallbackTests(unittest.TestCase):
+    def _generate(self, fake: _FakeStreamGenerate, **kwargs: object) -> str:
+        module = types.ModuleType("mlx_lm")
+        module.stream_generate = fake
+        with mock.patch.dict(sys.modules, {"mlx_lm": module}):
+            return inference_pipeline._stream_generate_with_fallback(
+                model=object(), tokenizer=object(), prompt="p", max_tokens=8, **kwargs
+            )
+
+    def test_decodes_greedily_with_temp_when_supported(self):
+        fake = _FakeStreamGenerate(rejected=set())
+        deltas: list[str] = []
+
+        text = self._generate(fake, on_text=deltas.append)
+
+        self.assertEqual(text, "Hi there")
+        self.assertEqual(deltas, ["Hi", " there"])
+        self.assertEqual(fake.calls, [{"temp": 0.0}])
+
+    def test_falls_back_to_plain_call_without_quantizing_kv_cache(self):
+        fake = _FakeStreamGenerate(rejected={"temp"})
+        cache = object()
+
+        text = self._generate(fake, prompt_cache=cache)
+
+        self.assertEqual(text, "Hi there")
+        self.assertEqual([sorted(call) for call in fake.calls], [["prompt_cache", "temp"], ["prompt_cache"]])
+        self.assertTrue(all(call["prompt_cache"] is cache for call in fake.calls))
+        self.assertFalse(any("kv_bits" in call for call in fake.calls))
+
+    def test_last_attempt_type_error_propagates(self):
+        fake = _FakeStreamGenerate(rejected={"temp", "prompt_cache"})
+
+        with self.assertRaises(TypeError):
+            self._generate(fake, prompt_cache=object())
+        self.assertEqual(len(fake.calls), 2)
+
+    def test_type_error_after_output_is_not_retried(self):
+        def failing_after_first_piece(model, tokenizer, prompt, max_tokens, **kwargs):
+            calls.append(kwargs)
+            yield _Response("partial")
+            raise TypeError("bad token")
+
+        calls: list[dict[str, object]] = []
+        module = types.ModuleType("mlx_lm")
+        module.stream_generate = failing_after_first_piece
+        with mock.patch.dict(sys.modules, {"mlx_lm": module}), self.assertRaises(TypeError):
+            inference_pipeline._stream_generate_with_fallback(
+                model=object(), tokenizer=object(), prompt="p", max_tokens=8
+            )
+        self.assertEqual(len(calls), 1)
+
+
+def _pipeline_config(skip_llm: bool = False) -> PipelineConfig:
+    return PipelineConfig(
+        audio_path=FIXTURE_WAV,
+        asr_model="asr",
+        llm_model="llm",
+        language="auto",
+        max_tokens=16,
+        skip_llm=skip_llm,
+    )
+
+
+class RunPipelineTests(unittest.TestCase):
+    def test_asr_error_is_raised_without_waiting_for_llm_warmup(self):
+        release = threading.Event()
+        warm_started = threading.Event()
+
+        def slow_warm(model_id: str) -> None:
+            warm_started.set()
+            release.wait(5.0)
+
+        try:
+            with mock.patch.object(inference_pipeline, "warm_llm", side_effect=slow_warm), mock.patch.object(
+                inference_pipeline, "run_asr", side_effect=RuntimeError("asr failed")
+            ):
+                with self.assertRaisesRegex(RuntimeError, "asr failed"):
+                    inference_pipeline.run_pipeline(_pipeline_config(), overlap_llm_load=True)
+                self.assertTrue(warm_started.wait(1.0))
+                self.assertFalse(release.is_set())
+        finally:
+            release.set()
+
+    def test_refinement_runs_after_warmup_and_asr(self):
+        order: list[str] = []
+
+        def warm(model_id: str) -> None:
+            order.append("warm")
+
+        def asr(config: PipelineConfig) -> tuple[str, float]:
+            order.append("asr")
+            return config.audio_path.name, 1.0
+
+        def llm(raw_text: str, config: PipelineConfig, on_text=None) -> tuple[str, float]:
+            order.append("llm")
+            return raw_text.upper(), 2.0
+
+        with mock.patch.object(inference_pipeline, "warm_llm", side_effect=warm), mock.patch.object(
+            inference_pipeline, "run_asr", side_effect=asr
+        ), mock.patch.object(inference_pipeline, "run_llm", side_effect=llm):
+            payload = inference_pipeline.run_pipeline(_pipeline_config(), overlap_llm_load=True)
+
+        self.assertEqual(payload["refined_text"], FIXTURE_WAV.name.upper())
+        self.assertEqual(order[-1], "llm")
+        self.assertIn("warm", order[:-1])
+        self.assertEqual(payload["meta"]["timing_ms"]["total"], 3.0)
+
+    def test_one_shot_run_skips_llm_load_for_empty_transcript(self):
+        with mock.patch.object(inference_pipeline, "warm_llm") as warm, mock.patch.object(
+            inference_pipeline, "run_asr", return_value=("", 1.0)
+        ), mock.patch.object(inference_pipeline.LLMManager, "get") as get:
+            payload = inference_pipeline.run_pipeline(_pipeline_config())
+
+        warm.assert_not_called()
+        get.assert_not_called()
+        self.assertEqual(payload["refined_text"], "")
+
+    def test_one_shot_cli_exits_without_waiting_for_llm_load(self):
+        # A slow LLM load must not keep the process alive after an empty transcript.
+        script = textwrap.dedent(
+            f"""
+            import sys, time
+            from unittest import mock
+            import inference_pipeline
+
+            def slow_warm(model_id):
+                time.sleep(10.0)
+
+            sys.argv = ["inference_pipeline.py", "--audio", {str(FIXTURE_WAV)!r}]
+            with mock.patch.object(inference_pipeline, "warm_llm", side_effect=slow_warm), mock.patch.object(
+                inference_pipeline, "run_asr", return_value=("", 1.0)
+            ), mock.patch.object(inference_pipeline.LLMManager, "get", side_effect=slow_warm):
+                status = inference_pipeline.main()
+            sys.exit(status)
+            """
+        )
+        started = time.monotonic()
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(inference_pipeline.__file__).resolve().parent,
+            capture_output=True,
+            timeout=30,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertLess(time.monotonic() - started, 5.0)
+
+    def test_inference_runs_on_worker_threads_not_the_caller(self):
+        threads: dict[str, str] = {}
+
+        def record(name: str, result):
+            def run(*args, **kwargs):
+                threads[name] = threading.current_thread().name
+                return result
+
+            return run
+
+        with mock.patch.object(inference_pipeline, "warm_llm", side_effect=record("warm", None)), mock.patch.object(
+            inference_pipeline, "run_asr", side_effect=record("asr", ("text", 1.0))
+        ), mock.patch.object(inference_pipeline, "run_llm", side_effect=record("llm", ("Text", 1.0))):
+            inference_pipeline.run_pipeline(_pipeline_config(), overlap_llm_load=True)
+            inference_pipeline.run_pipeline(_pipeline_config(skip_llm=True))
+
+        self.assertEqual(set(threads), {"warm", "asr", "llm"})
+        for name in threads.values():
+            self.assertTrue(name.startswith("ghosttype-mlx"), name)
+
+
+def _ndarray_transcribe(audio, path_or_hf_repo=None, language=None, task=None):
+    return {"text": ""}
+
+
+def _legacy_transcribe(audio_path):
+    return {"text": ""}
+
+
+class TranscribeInputRoutingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.inprocess = mock.patch.object(inference_pipeline, "_decode_audio_inprocess", return_value=None).start()
+        self.ffmpeg = mock.patch.object(
+            inference_pipeline, "_decode_audio_ffmpeg", return_value=np.zeros(4, dtype=np.float32)
+        ).start()
+        mock.patch.object(inference_pipeline, "_FFMPEG_BIN", "/opt/ghosttype/bin/ffmpeg").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _prepare(self, path: str | Path, transcribe=_ndarray_transcribe):
+        return inference_pipeline._prepare_transcribe_input(str(path), transcribe)
+
+    def test_pcm16_wav_uses_fast_path_only(self):
+        waveform = self._prepare(FIXTURE_WAV)
+
+        self.assertIsInstance(waveform, np.ndarray)
+        self.assertEqual(waveform.dtype, np.float32)
+        self.inprocess.assert_not_called()
+        self.ffmpeg.assert_not_called()
+
+    def test_unsupported_wav_prefers_soundfile_then_ffmpeg(self):
+        decoded = np.ones(8, dtype=np.float32)
+        with mock.patch.object(inference_pipeline, "load_wav_pcm16_mono", side_effect=WavFormatError("float")):
+            self.inprocess.return_value = decoded
+            self.assertIs(self._prepare("clip.wav"), decoded)
+            self.ffmpeg.assert_not_called()
+
+            self.inprocess.return_value = None
+            self.assertIs(self._prepare("clip.wav"), self.ffmpeg.return_value)
+
+    def test_unsupported_wav_without_decoders_raises(self):
+        with mock.patch.object(
+            inference_pipeline, "load_wav_pcm16_mono", side_effect=WavFormatError("float")
+        ), mock.patch.object(inference_pipeline, "_FFMPEG_BIN", None):
+            with self.assertRaisesRegex(RuntimeError, "ffmpeg is unavailable"):
+                self._prepare("clip.wav")
+
+    def test_sndfile_containers_fall_back_to_ffmpeg(self):
+        self.assertIs(self._prepare("clip.flac"), self.ffmpeg.return_value)
+        self.inprocess.assert_called_once_with(Path("clip.flac"))
+
+    def test_other_containers_go_straight_to_ffmpeg(self):
+        self.assertIs(self._prepare("clip.m4a"), self.ffmpeg.return_value)
+        self.inprocess.assert_not_called()
+        self.ffmpeg.assert_called_once_with(Path("clip.m4a"))
+
+        with mock.patch.object(inference_pipeline, "_FFMPEG_BIN", None):
+            with self.assertRaisesRegex(RuntimeError, "requires ffmpeg"):
+                self._prepare("clip.m4a")
+
+    def test_legacy_transcribe_gets_path_when_ffmpeg_resolved(self):
+        self.assertEqual(self._prepare("clip.m4a", _legacy_transcribe), "clip.m4a")
+        self.ffmpeg.assert_not_called()
+
+        with mock.patch.object(inference_pipeline, "_FFMPEG_BIN", None):
+            with self.assertRaisesRegex(RuntimeError, "does not accept ndarray"):
+                self._prepare("clip.m4a", _legacy_transcribe)
+
+    def test_ffmpeg_on_path_prepends_resolved_directory_and_restores(self):
+        ffmpeg_dir = str(Path("/opt/ghosttype/bin/ffmpeg").resolve().parent)
+        with mock.patch.dict(os.environ, {"PATH": "/usr/bin"}):
+            with inference_pipeline._ffmpeg_on_path(True):
+                self.assertEqual(os.environ["PATH"], os.pathsep.join([ffmpeg_dir, "/usr/bin"]))
+            self.assertEqual(os.environ["PATH"], "/usr/bin")
+
+            with inference_pipeline._ffmpeg_on_path(False):
+                self.assertEqual(os.environ["PATH"], "/usr/bin")
+
+
+class PreloadTests(unittest.TestCase):
+    def _fake_mlx_modules(self, events: list[tuple[str, bool]]) -> dict[str, types.ModuleType]:
+        lock = inference_pipeline._MLX_LOCK
+
+        def record(name: str) -> None:
+            events.append((name, lock._is_owned()))
+
+        mlx = types.ModuleType("mlx")
+        core = types.ModuleType("mlx.core")
+        core.float16 = "float16"
+        core.eval = lambda *args: record("llm_eval")
+        core.metal = types.SimpleNamespace(is_available=lambda: False)
+        mlx.core = core
+
+        whisper = types.ModuleType("mlx_whisper")
+        whisper.transcribe = lambda *args, **kwargs: {"text": ""}
+        whisper_transcribe = types.ModuleType("mlx_whisper.transcribe")
+        whisper_transcribe.ModelHolder = types.SimpleNamespace(get_model=lambda *args: record("asr_load"))
+
+        class _Model:
+            def parameters(self) -> dict[str, object]:
+                return {}
+
+        def load(model_id: str, lazy: bool = False):
+            record("llm_map" if lazy else "llm_load_eager")
+            return _Model(), _CharTokenizer()
+
+        mlx_lm = types.ModuleType("mlx_lm")
+        mlx_lm.load = load
+        mlx_lm.stream_generate = lambda model, tokenizer, prompt: iter(())
+        return {
+            "mlx": mlx,
+            "mlx.core": core,
+            "mlx_whisper": whisper,
+            "mlx_whisper.transcribe": whisper_transcribe,
+            "mlx_lm": mlx_lm,
+        }
+
+    def test_preload_serializes_mlx_evaluation_and_maps_llm_weights_outside_the_lock(self):
+        events: list[tuple[str, bool]] = []
+        self.addCleanup(self._reset_managers)
+        with mock.patch.dict(sys.modules, self._fake_mlx_modules(events)):
+            inference_pipeline.preload_models("asr-model", "llm-model")
+
+        self.assertEqual(
+            sorted(events),
+            [("asr_load", True), ("llm_eval", True), ("llm_map", False)],
+        )
+
+    def test_failed_asr_warmup_is_logged_and_retried(self):
+        events: list[tuple[str, bool]] = []
+        modules = self._fake_mlx_modules(events)
+        attempts: list[str] = []
+
+        def get_model(model_id: str, dtype: object) -> None:
+            attempts.append(model_id)
+            if len(attempts) == 1:
+                raise OSError("download interrupted")
+
+        modules["mlx_whisper.transcribe"].ModelHolder = types.SimpleNamespace(get_model=get_model)
+        self.addCleanup(self._reset_managers)
+        with mock.patch.dict(sys.modules, modules):
+            with self.assertLogs("ghosttype.pipeline", level="WARNING") as logs:
+                inference_pipeline.ASRManager.get("asr-model")
+            self.assertIn("download interrupted", logs.output[0])
+            self.assertIsNone(inference_pipeline.ASRManager._model_id)
+
+            inference_pipeline.ASRManager.get("asr-model")
+            inference_pipeline.ASRManager.get("asr-model")
+
+        self.assertEqual(attempts, ["asr-model", "asr-model"])
+        self.assertEqual(inference_pipeline.ASRManager._model_id, "asr-model")
+
+    def test_preload_failures_are_logged_not_raised(self):
+        with mock.patch.object(
+            inference_pipeline.ASRManager, "get", side_effect=RuntimeError("no whisper")
+        ), mock.patch.object(inference_pipeline, "warm_llm", side_effect=RuntimeError("no llm")):
+            with self.assertLogs("ghosttype.pipeline", level="WARNING") as logs:
+                inference_pipeline.preload_models("asr-model", "llm-model")
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("no whisper", logs.output[0])
+        self.assertIn("no llm", logs.output[1])
+
+    @staticmethod
+    def _reset_managers() -> None:
+        inference_pipeline.ASRManager._transcribe = None
+        inference_pipeline.ASRManager._model_id = None
+        inference_pipeline.LLMManager._model = None
+        inference_pipeline.LLMManager._tokenizer = None
+        inference_pipeline.LLMManager._model_id = None
+        inference_pipeline.LLMManager._prefix_ids = None
+        inference_pipeline.LLMManager._prefix_cache = None
+        inference_pipeline._GENERATE_ACCEPTS_IDS = None
+
+
+class _KVCache:
+    def to_quantized(self, group_size: int, bits: int) -> "_QuantizedKVCache":
+        return _QuantizedKVCache()
+
+
+class _QuantizedKVCache:
+    pass
+
+
+class RunLLMTests(unittest.TestCase):
+    def setUp(self) -> None:
+        cache_module = types.ModuleType("mlx_lm.models.cache")
+        cache_module.KVCache = _KVCache
+        cache_module.QuantizedKVCache = _QuantizedKVCache
+        cache_module.make_prompt_cache = lambda model: [_KVCache(), _KVCache()]
+        self.mlx_lm = types.ModuleType("mlx_lm")
+        modules = {
+            "mlx_lm": self.mlx_lm,
+            "mlx_lm.models": types.ModuleType("mlx_lm.models"),
+            "mlx_lm.models.cache": cache_module,
+        }
+        patchers = [
+            mock.patch.dict(sys.modules, modules),
+            mock.patch.object(inference_pipeline, "_GENERATE_ACCEPTS_IDS", None),
+            mock.patch.object(inference_pipeline.LLMManager, "prefix_cache", return_value=None),
+            mock.patch.object(inference_pipeline.LLMManager, "get", return_value=(object(), _CharTokenizer())),
+            mock.patch.object(inference_pipeline.LLMManager, "attention_status", "unknown"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _run_llm(self) -> tuple[list[dict[str, object]], str]:
+        calls: list[dict[str, object]] = []
+
+        def stream_generate(model, tokenizer, prompt, max_tokens, **kwargs):
+            calls.append(kwargs)
+            yield _Response("ok")
+
+        self.mlx_lm.stream_generate = stream_generate
+        inference_pipeline.run_llm("hello", _pipeline_config())
+        return calls, inference_pipeline.LLMManager.attention_status
+
+    def test_decode_keeps_full_precision_cache_on_fused_sdpa(self):
+        calls, status = self._run_llm()
+
+        self.assertEqual(status, "fused_sdpa")
+        self.assertFalse(any("kv_bits" in call for call in calls))
+
+    def test_quantized_cache_is_reported_as_quantized_sdpa(self):
+        cache = [_KVCache(), _KVCache().to_quantized(64, 8)]
+
+        self.assertEqual(inference_pipeline._attention_path(cache), "quantized_sdpa")
+
+    def test_unknown_without_an_owned_cache(self):
+        self.assertEqual(inference_pipeline._attention_path(None), "unknown")
+
+    def _string_only_stream_generate(self, calls: list[object], fail_after_output: bool = False):
+        def stream_generate(model, tokenizer, prompt, max_tokens, **kwargs):
+            calls.append(prompt)
+            if not isinstance(prompt, str):
+                if fail_after_output:
+                    yield _Response("partial")
+                raise ValueError("TextEncodeInput must be Union[TextInputSequence, ...]")
+            yield _Response("refined")
+
+        return stream_generate
+
+    def test_token_id_prompt_falls_back_to_text_once_rejected(self):
+        calls: list[object] = []
+        self.mlx_lm.stream_generate = self._string_only_stream_generate(calls)
+
+        refined, _ = inference_pipeline.run_llm("hello", _pipeline_config())
+        inference_pipeline.run_llm("again", _pipeline_config())
+
+        self.assertEqual(refined, "refined")
+        self.assertIsInstance(calls[0], list)
+        self.assertEqual([type(prompt) for prompt in calls[1:]], [str, str])
+        self.assertTrue(calls[1].endswith("<|im_start|>assistant\n"))
+        self.assertIs(inference_pipeline._GENERATE_ACCEPTS_IDS, False)
+
+    def test_token_id_prompt_support_is_remembered(self):
+        calls: list[object] = []
+
+        def stream_generate(model, tokenizer, prompt, max_tokens, **kwargs):
+            calls.append(prompt)
+            yield _Response("ok")
+
+        self.mlx_lm.stream_generate = stream_generate
+        inference_pipeline.run_llm("hello", _pipeline_config())
+
+        self.assertIsInstance(calls[0], list)
+        self.assertIs(inference_pipeline._GENERATE_ACCEPTS_IDS, True)
+
+    def test_rejection_after_streamed_output_is_not_retried(self):
+        calls: list[object] = []
+        self.mlx_lm.stream_generate = self._string_only_stream_generate(calls, fail_after_output=True)
+
+        with self.assertRaises(ValueError):
+            inference_pipeline.run_llm("hello", _pipeline_config(), on_text=lambda text: None)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(inference_pipeline._GENERATE_ACCEPTS_IDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
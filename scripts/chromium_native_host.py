@@ -8,19 +8,84 @@ JSON hint into GhostType's app-support inbox file:
 
 from __future__ import annotations
 
-import datetime as _dt
 import json
 import os
 import pathlib
+import re
 import struct
 import sys
+import threading
+import time
 import urllib.parse
-from typing import Any
+from typing import Any, BinaryIO
+
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes | memoryview) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
 
 
 HOST_NAME = "com.codeandchill.ghosttype.context"
 APP_SUPPORT_DIR = pathlib.Path.home() / "Library" / "Application Support" / "GhostType"
 INBOX_FILE = APP_SUPPORT_DIR / "browser-context-hint.json"
+INBOX_TEMP_FILE = INBOX_FILE.with_suffix(".tmp")
+
+# Fast path for ordinary http(s)/bare-host values: a leading scheme, or no "://"
+# anywhere; optional userinfo, an ASCII host, optional port, then the end of the
+# authority. Anything else (including tabs/newlines, which urlparse strips)
+# falls back to urllib.parse.
+_HOST_RE = re.compile(
+    r"""
+    (?!.*[\t\r\n])
+    (?:[A-Za-z][A-Za-z0-9+.-]*://|(?!.*://))
+    (?:[^/?#@\s\[\]]*@)?
+    ([A-Za-z0-9_.-]+)
+    (?::[0-9]*)?
+    (?:[/?#]|$)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Rapid tab switches collapse into one inbox write per quiet period.
+INBOX_DEBOUNCE_SECONDS = 0.05
+# An unchanged pair is still rewritten after this long: the app re-imports the
+# hint on mtime changes and expires it after 120s, and the extension's
+# once-a-minute heartbeat relies on these rewrites to keep it fresh.
+INBOX_REFRESH_SECONDS = 30.0
+
+# One flusher thread owns the debounced writes; state below is guarded by
+# _WRITE_CONDITION.
+_WRITE_CONDITION = threading.Condition()
+_LAST_WRITTEN: tuple[str, str] | None = None  # last pair written or queued
+_LAST_WRITTEN_AT = 0.0  # time.monotonic() when _LAST_WRITTEN was queued
+_PENDING_PAIR: tuple[str, str] | None = None
+_PENDING_DUE = 0.0
+_WRITE_ERROR: str | None = None  # last flush failure (names its pair), sent as an ack warning
+_FLUSHER: threading.Thread | None = None
+_INBOX_CLOSED = False
+_TIMESTAMP_PREFIX: tuple[int, str] = (-1, "")
+
+_LENGTH_PREFIX = struct.Struct("<I")
+# Reused across messages; grown on demand for unusually large payloads.
+_READ_BUFFER = bytearray(65536)
+
+# Response bodies are reused and filled in place per message.
+_OK_RESPONSE: dict[str, Any] = {"ok": True, "host": HOST_NAME, "bundleId": "", "activeDomain": ""}
+_MISSING_DOMAIN_RESPONSE: dict[str, Any] = {"ok": False, "error": "Missing usable domain in message."}
 
 DEFAULT_BUNDLE_BY_BROWSER = {
     "chrome": "com.google.Chrome",
@@ -30,28 +95,41 @@ DEFAULT_BUNDLE_BY_BROWSER = {
 }
 
 
+def _read_exact(stream: BinaryIO, view: memoryview) -> bool:
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
 def _read_message() -> dict[str, Any] | None:
-    raw_length = sys.stdin.buffer.read(4)
-    if not raw_length:
+    global _READ_BUFFER
+    stream = sys.stdin.buffer
+    if not _read_exact(stream, memoryview(_READ_BUFFER)[: _LENGTH_PREFIX.size]):
         return None
-    if len(raw_length) != 4:
-        return None
-    msg_length = struct.unpack("<I", raw_length)[0]
-    raw_payload = sys.stdin.buffer.read(msg_length)
-    if len(raw_payload) != msg_length:
+    msg_length = _LENGTH_PREFIX.unpack_from(_READ_BUFFER)[0]
+    if msg_length > len(_READ_BUFFER):
+        _READ_BUFFER = bytearray(msg_length)
+    raw_payload = memoryview(_READ_BUFFER)[:msg_length]
+    if not _read_exact(stream, raw_payload):
         return None
     try:
-        payload = json.loads(raw_payload.decode("utf-8"))
+        payload = _loads(raw_payload)
     except Exception:
         return None
+    finally:
+        raw_payload.release()
     if not isinstance(payload, dict):
         return None
     return payload
 
 
 def _send_message(message: dict[str, Any]) -> None:
-    data = json.dumps(message, ensure_ascii=False).encode("utf-8")
-    sys.stdout.buffer.write(struct.pack("<I", len(data)))
+    data = _dumps(message)
+    sys.stdout.buffer.write(_LENGTH_PREFIX.pack(len(data)))
     sys.stdout.buffer.write(data)
     sys.stdout.buffer.flush()
 
@@ -60,16 +138,18 @@ def _extract_domain(value: str) -> str | None:
     candidate = value.strip()
     if not candidate:
         return None
-    parsed = urllib.parse.urlparse(candidate)
-    host = (parsed.hostname or "").strip().lower()
-    if host:
-        return host
+    match = _HOST_RE.match(candidate)
+    if match is not None:
+        return match.group(1).lower()
+    return _extract_domain_slow(candidate)
+
+
+def _extract_domain_slow(candidate: str) -> str | None:
+    # Decide the scheme syntactically so urlparse runs exactly once.
     if "://" not in candidate:
-        parsed = urllib.parse.urlparse(f"https://{candidate}")
-        host = (parsed.hostname or "").strip().lower()
-        if host:
-            return host
-    return None
+        candidate = f"https:{candidate}" if candidate.startswith("//") else f"https://{candidate}"
+    host = (urllib.parse.urlparse(candidate).hostname or "").strip().lower()
+    return host or None
 
 
 def _normalize_payload(message: dict[str, Any]) -> tuple[str, str] | tuple[None, None]:
@@ -103,44 +183,128 @@ def _normalize_payload(message: dict[str, Any]) -> tuple[str, str] | tuple[None,
     return bundle_id, domain
 
 
+def _utc_timestamp() -> str:
+    """UTC time in datetime.isoformat() shape, reusing the formatted date/time per second."""
+    global _TIMESTAMP_PREFIX
+    now = time.time()
+    seconds = int(now)
+    cached_seconds, prefix = _TIMESTAMP_PREFIX
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _TIMESTAMP_PREFIX = (seconds, prefix)
+    return f"{prefix}.{int((now - seconds) * 1_000_000):06d}+00:00"
+
+
 def _write_inbox(bundle_id: str, domain: str) -> None:
-    APP_SUPPORT_DIR.mkdir(parents=True, exist_ok=True)
     payload = {
         "bundleId": bundle_id,
         "activeDomain": domain,
         "source": "extension",
-        "updatedAt": _dt.datetime.now(tz=_dt.timezone.utc).isoformat(),
+        "updatedAt": _utc_timestamp(),
     }
-    temp_file = INBOX_FILE.with_suffix(".tmp")
-    temp_file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
-    os.replace(temp_file, INBOX_FILE)
+    data = _dumps(payload)
+    # No fsync: the atomic rename is enough for a hint file the app re-reads.
+    try:
+        fd = os.open(INBOX_TEMP_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    except FileNotFoundError:
+        # The directory is created once at startup; recreate it if it was removed since.
+        APP_SUPPORT_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(INBOX_TEMP_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(INBOX_TEMP_FILE, INBOX_FILE)
+
+
+def _queue_inbox(bundle_id: str, domain: str) -> str | None:
+    """Schedule a debounced inbox write and return any unreported earlier write failure.
+
+    A pair identical to the last one is skipped unless that write is older
+    than INBOX_REFRESH_SECONDS.
+    """
+    global _LAST_WRITTEN, _LAST_WRITTEN_AT, _PENDING_PAIR, _PENDING_DUE, _WRITE_ERROR, _FLUSHER
+    pair = (bundle_id, domain)
+    with _WRITE_CONDITION:
+        error, _WRITE_ERROR = _WRITE_ERROR, None
+        now = time.monotonic()
+        if pair == _LAST_WRITTEN and now - _LAST_WRITTEN_AT < INBOX_REFRESH_SECONDS:
+            return error
+        _LAST_WRITTEN = pair
+        _LAST_WRITTEN_AT = now
+        _PENDING_PAIR = pair
+        _PENDING_DUE = now + INBOX_DEBOUNCE_SECONDS
+        if _FLUSHER is None:
+            _FLUSHER = threading.Thread(target=_flusher_loop, name="inbox-flusher", daemon=True)
+            _FLUSHER.start()
+        _WRITE_CONDITION.notify()
+        return error
+
+
+def _flusher_loop() -> None:
+    global _PENDING_PAIR
+    with _WRITE_CONDITION:
+        while not _INBOX_CLOSED:
+            if _PENDING_PAIR is None:
+                _WRITE_CONDITION.wait()
+                continue
+            delay = _PENDING_DUE - time.monotonic()
+            if delay > 0:
+                # Woken early by a newer pair, which pushes the deadline back.
+                _WRITE_CONDITION.wait(delay)
+                continue
+            pair, _PENDING_PAIR = _PENDING_PAIR, None
+            _flush_pair(pair)
+
+
+def _flush_pair(pair: tuple[str, str]) -> None:
+    """Write ``pair`` to the inbox; the caller holds _WRITE_CONDITION."""
+    global _LAST_WRITTEN, _WRITE_ERROR
+    try:
+        _write_inbox(bundle_id=pair[0], domain=pair[1])
+    except Exception as exc:  # pragma: no cover - host resilience path
+        # Forget the pair so the next message for it retries the write.
+        _LAST_WRITTEN = None
+        _WRITE_ERROR = f"Inbox write failed for {pair[1]} ({pair[0]}): {exc}"
+        print(f"{HOST_NAME}: inbox write failed: {exc}", file=sys.stderr, flush=True)
+
+
+def _shutdown_inbox() -> None:
+    global _INBOX_CLOSED, _PENDING_PAIR
+    with _WRITE_CONDITION:
+        _INBOX_CLOSED = True
+        pair, _PENDING_PAIR = _PENDING_PAIR, None
+        if pair is not None:
+            _flush_pair(pair)
+        _WRITE_CONDITION.notify()
 
 
 def main() -> int:
+    try:
+        APP_SUPPORT_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:  # pragma: no cover - host resilience path
+        print(f"{HOST_NAME}: cannot create {APP_SUPPORT_DIR}: {exc}", file=sys.stderr, flush=True)
+
     while True:
         message = _read_message()
         if message is None:
+            _shutdown_inbox()
             return 0
 
         bundle_id, domain = _normalize_payload(message)
         if not bundle_id or not domain:
-            _send_message({"ok": False, "error": "Missing usable domain in message."})
+            _send_message(_MISSING_DOMAIN_RESPONSE)
             continue
 
-        try:
-            _write_inbox(bundle_id=bundle_id, domain=domain)
-        except Exception as exc:  # pragma: no cover - host resilience path
-            _send_message({"ok": False, "error": str(exc)})
+        # The current pair was queued fine; an earlier pair's failed write is
+        # passed along as a warning rather than failing this ack.
+        write_warning = _queue_inbox(bundle_id=bundle_id, domain=domain)
+        _OK_RESPONSE["bundleId"] = bundle_id
+        _OK_RESPONSE["activeDomain"] = domain
+        if write_warning is not None:
+            _send_message({**_OK_RESPONSE, "warning": write_warning})
             continue
-
-        _send_message(
-            {
-                "ok": True,
-                "host": HOST_NAME,
-                "bundleId": bundle_id,
-                "activeDomain": domain,
-            }
-        )
+        _send_message(_OK_RESPONSE)
 
 
 if __name__ == "__main__":